@@ -26,11 +26,13 @@ bl_info = {
 
 if "bpy" in locals():
     import importlib
+    importlib.reload(connector)
     importlib.reload(connect_edges)
     importlib.reload(preferences)
 else:
 
     from . import (
+        connector,
         connect_edges,
         preferences
     )
@@ -0,0 +1,492 @@
+""" Apply connect edges to many .blend files without the UI.
+
+    Usage:
+        blender --background --python batch.py -- [options] path [path ...]
+
+    The edges to connect are the ones flagged by an edge attribute (--attribute) or by their crease (--crease).
+    Paths can be .blend files or directories, which are searched recursively. Every file is opened, connected
+    and saved by its own background Blender process and up to --jobs processes run at the same time.
+    The script can also be started with a plain python interpreter, as long as --blender points to Blender.
+
+    For many small files, starting Blender costs more than connecting the edges. A directory job queue served by
+    long-lived workers avoids that:
+        blender --background --python batch.py -- --serve QUEUE [-j N] [--exit-when-empty]
+        blender --background --python batch.py -- --submit QUEUE [options] path [path ...]
+        blender --background --python batch.py -- --stop QUEUE
+
+    Every job carries its own options. Workers keep the addon modules loaded and only open, connect and save files.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+
+# Prefix of the line a worker prints to report its result to the pool
+RESULT_PREFIX = "CONNECT_EDGES_RESULT "
+
+# Seconds an idle queue worker waits before looking for new jobs
+POLL_INTERVAL = 0.1
+
+
+def import_addon_module(name):
+    """ Import a module of this addon without running the addon's __init__, which pulls in the UI modules. """
+
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    package_name = os.path.basename(package_dir)
+
+    if package_name not in sys.modules:
+        package = types.ModuleType(package_name)
+        package.__path__ = [package_dir]
+        sys.modules[package_name] = package
+
+    return importlib.import_module(package_name + "." + name)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="batch.py", description="Apply connect edges to many .blend files.")
+    parser.add_argument("paths", nargs="*", help=".blend files or directories to process")
+
+    flags = parser.add_mutually_exclusive_group()
+    flags.add_argument("--attribute", help="Connect the edges where this edge attribute is above the threshold")
+    flags.add_argument("--crease", action="store_true", help="Connect the edges whose crease is above the threshold")
+
+    parser.add_argument("--threshold", type=float, default=0.0, help="Edges with a value above this are flagged")
+    parser.add_argument("--segments", type=int, default=1, help="Number of segments")
+
+    counts = parser.add_mutually_exclusive_group()
+    counts.add_argument("--segments-attribute", metavar="ATTRIBUTE",
+                        help="Read the number of segments of each strip of faces from this edge attribute. "
+                             "Strips without a count use --segments")
+    counts.add_argument("--segments-crease", action="store_true",
+                        help="Read the number of segments of each strip of faces from the crease, 0.1 per segment. "
+                             "Strips without a count use --segments")
+    parser.add_argument("--pinch", type=int, default=0, choices=range(-100, 101), metavar="[-100..100]",
+                        help="Pinch value")
+    parser.add_argument("--even", default="NO", choices=("NO", "IN", "OUT", "RING_IN", "RING_OUT"),
+                        help="Even setting")
+
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Number of Blender processes to run at the same time")
+    parser.add_argument("--blender", default=bpy.app.binary_path if bpy is not None else "blender",
+                        help="Path to the Blender executable used for the workers")
+
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument("--submit", metavar="QUEUE", help="Add the files as jobs to a queue directory")
+    modes.add_argument("--serve", metavar="QUEUE", help="Start --jobs workers that process the jobs of a queue")
+    modes.add_argument("--stop", metavar="QUEUE", help="Ask the workers of a queue to exit once they are idle")
+    modes.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    modes.add_argument("--queue-worker", metavar="QUEUE", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-id", default="0", help=argparse.SUPPRESS)
+
+    parser.add_argument("--exit-when-empty", action="store_true",
+                        help="Queue workers exit as soon as there are no jobs left")
+
+    args = parser.parse_args(argv)
+    if args.segments < 1:
+        parser.error("--segments must be at least 1")
+
+    if not (args.serve or args.stop or args.queue_worker) and args.attribute is None and not args.crease:
+        parser.error("one of the arguments --attribute --crease is required")
+
+    return args
+
+
+def script_args():
+    """ Blender passes the arguments after '--' to the script. """
+    if bpy is None:
+        return sys.argv[1:]
+
+    if "--" in sys.argv:
+        return sys.argv[sys.argv.index("--") + 1:]
+
+    return []
+
+
+def job_options(args):
+    """ Options of the connect operation, as stored in a queued job. """
+    return {"segments": args.segments, "pinch": args.pinch, "even": args.even,
+            "attribute": args.attribute, "threshold": args.threshold,
+            "segments_attribute": args.segments_attribute, "segments_crease": args.segments_crease}
+
+
+def worker_args(args):
+    """ Command line options forwarded from the pool to its workers. """
+
+    ret = ["--segments", str(args.segments), "--pinch", str(args.pinch), "--even", args.even,
+           "--threshold", str(args.threshold)]
+
+    if args.attribute is not None:
+        ret += ["--attribute", args.attribute]
+    else:
+        ret.append("--crease")
+
+    if args.segments_attribute is not None:
+        ret += ["--segments-attribute", args.segments_attribute]
+    elif args.segments_crease:
+        ret.append("--segments-crease")
+
+    return ret
+
+
+def collect_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(".blend"))
+        else:
+            files.append(path)
+
+    return files
+
+
+def connect_loaded_file(args):
+    """ Connect the flagged edges of every mesh in the currently loaded file.
+
+        Each mesh is processed once, no matter how many objects use it.
+
+        Returns:
+            The number of meshes and the number of flagged edges that were connected.
+    """
+
+    connector = import_addon_module("connector")
+    utils = import_addon_module("utils")
+
+    if bpy.context.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    num_meshes = 0
+    num_edges = 0
+    for mesh, users in utils.group_objects_by_mesh(bpy.data.objects).items():
+        # Linked data can't be written to
+        if mesh.library is not None:
+            continue
+
+        values = utils.get_edge_values(mesh, args.attribute)
+        if values is None:
+            continue
+
+        edges = (values > args.threshold).nonzero()[0].tolist()
+        if len(edges) < 2:
+            continue
+
+        # Read in bulk and resolved per strip by the connector, all strips are built in one go
+        # Jobs queued by older versions have no segment count options
+        segments_attribute = getattr(args, "segments_attribute", None)
+        segment_counts = None
+        if segments_attribute is not None or getattr(args, "segments_crease", False):
+            segment_counts = utils.get_edge_segments(mesh, segments_attribute)
+
+        connector.connect_edges(mesh, edges, args.segments, args.pinch, args.even, segment_counts=segment_counts)
+
+        num_meshes += 1
+        num_edges += len(edges)
+
+    return num_meshes, num_edges
+
+
+def run_worker(args):
+    """ Process the file Blender was started with and print the result for the pool. """
+
+    result = {"file": bpy.data.filepath}
+    start = time.perf_counter()
+
+    try:
+        result["meshes"], result["edges"] = connect_loaded_file(args)
+        result["connect_time"] = time.perf_counter() - start
+
+        if result["meshes"]:
+            bpy.ops.wm.save_mainfile()
+    except Exception as e:
+        result["error"] = str(e)
+
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+    return 1 if "error" in result else 0
+
+
+def format_result(result):
+    if "error" in result:
+        return "FAILED {file} ({time:.2f}s): {error}".format(**result)
+
+    return "{file}: {meshes} meshes, {edges} edges, connect {connect_time:.3f}s, total {time:.2f}s".format(**result)
+
+
+def run_file(args, path):
+    """ Start a background Blender process for a single file and wait for its result. """
+
+    cmd = [args.blender, "--background", "--factory-startup", path,
+           "--python", os.path.abspath(__file__), "--", "--worker"] + worker_args(args)
+
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+
+    result = None
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            result = json.loads(line[len(RESULT_PREFIX):])
+
+    if result is None:
+        # Blender failed before the worker could report, keep the end of its output
+        output = "\n".join(proc.stdout.splitlines()[-5:])
+        result = {"error": "Blender exited with code {0}\n{1}".format(proc.returncode, output)}
+
+    result["file"] = path
+    result["time"] = time.perf_counter() - start
+
+    return result
+
+
+def run_pool(args):
+    files = collect_files(args.paths)
+    failed = 0
+    start = time.perf_counter()
+
+    # The work happens in the Blender processes, threads are enough to keep them running
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        futures = [executor.submit(run_file, args, path) for path in files]
+
+        for future in as_completed(futures):
+            result = future.result()
+
+            if "error" in result:
+                failed += 1
+            print(format_result(result))
+
+    print("Processed {0} files in {1:.2f}s, {2} failed".format(len(files), time.perf_counter() - start, failed))
+    return 1 if failed else 0
+
+
+class JobQueue(object):
+    """ A job queue stored in a directory.
+
+        Pending jobs are json files in 'pending'. A worker claims a job by moving it to its own directory in 'running',
+        which is atomic, so every job is processed by exactly one worker. The job and its result are written to 'done'.
+        Jobs still in 'running' belong to a worker that died.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.pending = os.path.join(path, "pending")
+        self.running = os.path.join(path, "running")
+        self.done = os.path.join(path, "done")
+        self.stop_file = os.path.join(path, "stop")
+
+        for directory in (self.pending, self.running, self.done):
+            os.makedirs(directory, exist_ok=True)
+
+    def submit(self, files, options):
+        for i, path in enumerate(files):
+            job = dict(options, file=os.path.abspath(path))
+            name = "{0:020d}-{1}-{2}.json".format(time.time_ns(), os.getpid(), i)
+
+            # Write next to the queue and move it in, so workers never see a partial job
+            tmp_path = os.path.join(self.path, name + ".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(job, f)
+            os.replace(tmp_path, os.path.join(self.pending, name))
+
+    def running_dir(self, worker_id):
+        return os.path.join(self.running, str(worker_id))
+
+    def claim(self, worker_id="0"):
+        """ Take the oldest pending job. Returns the name and the job, or None if the queue is empty. """
+
+        running = self.running_dir(worker_id)
+        os.makedirs(running, exist_ok=True)
+
+        for name in sorted(os.listdir(self.pending)):
+            if not name.endswith(".json"):
+                continue
+
+            try:
+                os.rename(os.path.join(self.pending, name), os.path.join(running, name))
+            except FileNotFoundError:
+                # Another worker was faster
+                continue
+
+            with open(os.path.join(running, name)) as f:
+                return name, json.load(f)
+
+        return None
+
+    def complete(self, name, job, result, worker_id="0"):
+        with open(os.path.join(self.done, name), "w") as f:
+            json.dump(dict(job, result=result), f)
+        os.remove(os.path.join(self.running_dir(worker_id), name))
+
+    def requeue(self):
+        """ Move the jobs left in 'running' back to 'pending'. Only safe while no worker serves the queue.
+
+            Returns the number of jobs moved.
+        """
+
+        count = 0
+        for worker_id in os.listdir(self.running):
+            running = self.running_dir(worker_id)
+            if not os.path.isdir(running):
+                continue
+
+            for name in os.listdir(running):
+                os.replace(os.path.join(running, name), os.path.join(self.pending, name))
+                count += 1
+
+        return count
+
+    def fail(self, worker_id, error):
+        """ Complete the jobs a worker left in 'running' with an error. Returns their results. """
+
+        running = self.running_dir(worker_id)
+        if not os.path.isdir(running):
+            return []
+
+        results = []
+        for name in sorted(os.listdir(running)):
+            with open(os.path.join(running, name)) as f:
+                job = json.load(f)
+
+            result = {"file": job["file"], "error": error, "time": 0.0}
+            self.complete(name, job, result, worker_id)
+            results.append(result)
+
+        return results
+
+    def stop(self):
+        open(self.stop_file, "w").close()
+
+    def is_stopped(self):
+        return os.path.exists(self.stop_file)
+
+
+def process_job(job):
+    """ Open, connect and save the file of a job in the running Blender. """
+
+    result = {"file": job["file"]}
+    start = time.perf_counter()
+
+    try:
+        bpy.ops.wm.open_mainfile(filepath=job["file"], load_ui=False)
+        load_end = time.perf_counter()
+
+        result["meshes"], result["edges"] = connect_loaded_file(types.SimpleNamespace(**job))
+        result["connect_time"] = time.perf_counter() - load_end
+
+        if result["meshes"]:
+            bpy.ops.wm.save_mainfile()
+    except Exception as e:
+        result["error"] = str(e)
+
+    result["time"] = time.perf_counter() - start
+    return result
+
+
+def run_queue_worker(args):
+    """ Process jobs until the queue is stopped, or until it is empty with --exit-when-empty. """
+
+    queue = JobQueue(args.queue_worker)
+    failed = 0
+
+    while True:
+        claimed = queue.claim(args.worker_id)
+
+        if claimed is None:
+            if args.exit_when_empty or queue.is_stopped():
+                break
+
+            time.sleep(POLL_INTERVAL)
+            continue
+
+        name, job = claimed
+        result = process_job(job)
+        queue.complete(name, job, result, args.worker_id)
+
+        if "error" in result:
+            failed += 1
+        print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+    return 1 if failed else 0
+
+
+def report_worker(queue, worker_id, proc):
+    """ Print the results of a queue worker while it runs. Returns the number of failed jobs. """
+
+    failed = 0
+    for line in proc.stdout:
+        if line.startswith(RESULT_PREFIX):
+            result = json.loads(line[len(RESULT_PREFIX):])
+            if "error" in result:
+                failed += 1
+            print(format_result(result), flush=True)
+
+    proc.wait()
+
+    # A job the worker died on is failed rather than queued again, it would likely bring down the next worker too
+    for result in queue.fail(worker_id, "Queue worker exited with code {0}".format(proc.returncode)):
+        failed += 1
+        print(format_result(result), flush=True)
+
+    return failed
+
+
+def run_server(args):
+    queue = JobQueue(args.serve)
+    if queue.is_stopped():
+        os.remove(queue.stop_file)
+
+    # Jobs of a server that was killed
+    requeued = queue.requeue()
+    if requeued:
+        print("Requeued {0} interrupted jobs".format(requeued), flush=True)
+
+    cmd = [args.blender, "--background", "--factory-startup",
+           "--python", os.path.abspath(__file__), "--", "--queue-worker", args.serve]
+    if args.exit_when_empty:
+        cmd.append("--exit-when-empty")
+
+    worker_ids = [str(i) for i in range(max(1, args.jobs))]
+    workers = [subprocess.Popen(cmd + ["--worker-id", worker_id], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                universal_newlines=True)
+               for worker_id in worker_ids]
+
+    with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+        failed = sum(executor.map(report_worker, [queue] * len(workers), worker_ids, workers))
+
+    return 1 if failed else 0
+
+
+def main():
+    args = parse_args(script_args())
+
+    if args.worker:
+        return run_worker(args)
+
+    if args.queue_worker:
+        return run_queue_worker(args)
+
+    if args.serve:
+        return run_server(args)
+
+    if args.submit:
+        JobQueue(args.submit).submit(collect_files(args.paths), job_options(args))
+        return 0
+
+    if args.stop:
+        JobQueue(args.stop).stop()
+        return 0
+
+    return run_pool(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,12 @@ from . bl_ui_widget import *
 import blf
 import bpy
 
+from . bl_ui_text_metrics import text_metrics
+
 class BL_UI_Button(BL_UI_Widget):
+
+    # The background color follows the hover and pressed state
+    static_panel = False
     
     def __init__(self, x, y, width, height):
         super().__init__(x, y, width, height)
@@ -35,6 +40,7 @@ class BL_UI_Button(BL_UI_Widget):
     @text.setter
     def text(self, value):
         self._text = value
+        self.invalidate()
                 
     @property
     def text_size(self):
@@ -91,8 +97,8 @@ class BL_UI_Button(BL_UI_Widget):
                     (self.x_screen + off_x + sx, y_screen_flip - sy - off_y),
                     (self.x_screen + off_x + sx, y_screen_flip - off_x))
         
-        self.shader_img = gpu.shader.from_builtin('2D_IMAGE')
-        self.batch_img = batch_for_shader(self.shader_img, 'TRI_FAN', 
+        self.shader_img = render_cache.shader('2D_IMAGE')
+        self.batch_img = render_cache.batch(self, "image", '2D_IMAGE', 'TRI_FAN', 
         { "pos" : vertices, 
           "texCoord": ((0, 1), (0, 0), (1, 0), (1, 1)) 
         },)
@@ -131,8 +137,8 @@ class BL_UI_Button(BL_UI_Widget):
         self.shader.uniform_float("color", color)
 
     def draw_text(self, area_height):
-        blf.size(0, self._text_size, 72)
-        size = blf.dimensions(0, self._text)
+        text_metrics.size(0, self._text_size, 72)
+        size = text_metrics.dimensions(0, self._text)
 
         textpos_y = area_height - self._textpos[1] - (self.height + size[1]) / 2.0
         blf.position(0, self._textpos[0] + (self.width - size[0]) / 2.0, textpos_y + 1, 0)
@@ -160,10 +166,15 @@ class BL_UI_Button(BL_UI_Widget):
         
     def set_mouse_down(self, mouse_down_func):
         self.mouse_down_func = mouse_down_func   
+
+    def set_state(self, state):
+        if state != self.__state:
+            self.__state = state
+            self.invalidate()
                  
     def mouse_down(self, x, y):    
         if self.is_in_rect(x,y):
-            self.__state = 1
+            self.set_state(1)
             try:
                 self.mouse_down_func(self)
             except:
@@ -178,12 +189,12 @@ class BL_UI_Button(BL_UI_Widget):
             if(self.__state != 1):
                 
                 # hover state
-                self.__state = 2
+                self.set_state(2)
         else:
-            self.__state = 0
+            self.set_state(0)
  
     def mouse_up(self, x, y):
         if self.is_in_rect(x,y):
-            self.__state = 2
+            self.set_state(2)
         else:
-            self.__state = 0
\ No newline at end of file
+            self.set_state(0)
\ No newline at end of file
@@ -3,7 +3,11 @@ from . bl_ui_widget import *
 import blf
 import bpy
 
+from . bl_ui_text_metrics import text_metrics
+
 class BL_UI_Checkbox(BL_UI_Widget):
+
+    static_panel = False
     
     def __init__(self, x, y, width, height):
         super().__init__(x, y, width, height)
@@ -50,6 +54,7 @@ class BL_UI_Checkbox(BL_UI_Widget):
     def is_checked(self, value):
         if value != self.__state:
             self.__state = value
+            self.invalidate()
 
             self.call_state_changed()
 
@@ -66,7 +71,7 @@ class BL_UI_Checkbox(BL_UI_Widget):
         off_y = 0
         sx, sy = self.__boxsize 
 
-        self.shader_chb = gpu.shader.from_builtin('2D_UNIFORM_COLOR')
+        self.shader_chb = render_cache.shader('2D_UNIFORM_COLOR')
         
         # top left, top right, ...
         vertices_box = (
@@ -75,7 +80,7 @@ class BL_UI_Checkbox(BL_UI_Widget):
                     (self.x_screen + off_x + sx, y_screen_flip - off_y),
                     (self.x_screen + off_x,      y_screen_flip - off_y))
 
-        self.batch_box = batch_for_shader(self.shader_chb, 'LINE_LOOP', {"pos": vertices_box})
+        self.batch_box = render_cache.batch(self, "box", '2D_UNIFORM_COLOR', 'LINE_LOOP', {"pos": vertices_box})
 
         inset = 4
 
@@ -86,7 +91,7 @@ class BL_UI_Checkbox(BL_UI_Widget):
             (self.x_screen + off_x + sx - inset, y_screen_flip - off_y -  inset), 
             (self.x_screen + off_x + inset, y_screen_flip - off_y - sy + inset))
 
-        self.batch_cross = batch_for_shader(self.shader_chb, 'LINES', {"pos": vertices_cross})
+        self.batch_cross = render_cache.batch(self, "cross", '2D_UNIFORM_COLOR', 'LINES', {"pos": vertices_cross})
 
    
     def draw(self):
@@ -110,8 +115,8 @@ class BL_UI_Checkbox(BL_UI_Widget):
 
 
     def draw_text(self, area_height):
-        blf.size(0, self._text_size, 72)
-        size = blf.dimensions(0, self._text)
+        text_metrics.size(0, self._text_size, 72)
+        size = text_metrics.dimensions(0, self._text)
 
         textpos_y = area_height - self._textpos[1] - (self.height + size[1]) / 2.0
         blf.position(0, self._textpos[0], textpos_y, 0)
@@ -144,6 +149,7 @@ class BL_UI_Checkbox(BL_UI_Widget):
 
     def toggle_state(self):
         self.__state = not self.__state
+        self.invalidate()
 
     def mouse_enter(self, event, x, y):
         if self._mouse_down:
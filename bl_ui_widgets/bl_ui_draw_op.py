@@ -1,12 +1,18 @@
 import bpy
+import bgl
 
 from bpy.types import Operator
 
+from . bl_ui_render_cache import render_cache, merge_rects, get_draw_runs
+
 class BL_UI_OT_draw_operator(Operator):
     bl_idname = "object.bl_ui_ot_draw_operator"
     bl_label = "bl ui widgets operator"
     bl_description = "Operator for bl ui widgets" 
     bl_options = {'REGISTER'}
+
+    # Seconds between redraws for animated widgets. None redraws only when a widget changed.
+    animation_interval = None
     	
     def __init__(self):
         self.draw_handle = None
@@ -18,6 +24,8 @@ class BL_UI_OT_draw_operator(Operator):
         self.widgets = widgets
         for widget in self.widgets:
             widget.init(context)
+        # Static panels are drawn together by draw_widgets
+        merge_panels(self.widgets)
 
     def on_invoke(self, context, event):
         pass
@@ -29,17 +37,20 @@ class BL_UI_OT_draw_operator(Operator):
         args = (self, context)
                    
         self.register_handlers(args, context)
+        self.redraw_widgets(context)
                    
         context.window_manager.modal_handler_add(self)
         return {"RUNNING_MODAL"}
     
     def register_handlers(self, args, context):
         self.draw_handle = bpy.types.SpaceView3D.draw_handler_add(self.draw_callback_px, args, "WINDOW", "POST_PIXEL")
-        self.draw_event = context.window_manager.event_timer_add(0.1, window=context.window)
+        if self.animation_interval is not None:
+            self.draw_event = context.window_manager.event_timer_add(self.animation_interval, window=context.window)
         
     def unregister_handlers(self, context):
         
-        context.window_manager.event_timer_remove(self.draw_event)
+        if self.draw_event is not None:
+            context.window_manager.event_timer_remove(self.draw_event)
         
         bpy.types.SpaceView3D.draw_handler_remove(self.draw_handle, "WINDOW")
         
@@ -53,11 +64,28 @@ class BL_UI_OT_draw_operator(Operator):
                 result = True
         return result
           
-    def modal(self, context, event):
-        if context.area:
+    def redraw_widgets(self, context):
+        """ Redraw the region if a widget changed since the last redraw. """
+        invalid = False
+        for widget in self.widgets:
+            if widget.needs_redraw:
+                widget.needs_redraw = False
+                invalid = True
+
+        if invalid and context.area:
             context.area.tag_redraw()
-        
-        if self.handle_widget_events(event):
+
+    def modal(self, context, event):
+        if event.type == 'TIMER' and self.draw_event is not None:
+            # Animation frame
+            if context.area:
+                context.area.tag_redraw()
+            return {'PASS_THROUGH'}
+
+        handled = self.handle_widget_events(event)
+        self.redraw_widgets(context)
+
+        if handled:
             return {'RUNNING_MODAL'}   
         
         if event.type in {"ESC"}:
@@ -72,5 +100,30 @@ class BL_UI_OT_draw_operator(Operator):
 		
 	# Draw handler to paint onto the screen
     def draw_callback_px(self, op, context):
-        for widget in self.widgets:
-            widget.draw()
\ No newline at end of file
+        draw_widgets(self, self.widgets)
+
+
+def merge_panels(widgets):
+    """ Let draw_widgets draw the static panels of the widgets with merged batches. """
+    for widget in widgets:
+        widget.merged = widget.static_panel
+
+
+def draw_widgets(owner, widgets):
+    """ Draw widgets in order, the static panels of each run with one batch, see get_draw_runs.
+
+        The batches are cached for owner and rebuilt only when a panel moved or changed color.
+    """
+    for run, (run_widgets, rects) in enumerate(get_draw_runs(widgets)):
+        if rects:
+            content, indices = merge_rects(rects)
+            shader = render_cache.shader('2D_FLAT_COLOR')
+            batch = render_cache.batch(owner, "panels{0}".format(run), '2D_FLAT_COLOR', 'TRIS', content, indices=indices)
+
+            shader.bind()
+            bgl.glEnable(bgl.GL_BLEND)
+            batch.draw(shader)
+            bgl.glDisable(bgl.GL_BLEND)
+
+        for widget in run_widgets:
+            widget.draw()
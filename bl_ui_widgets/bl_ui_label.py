@@ -3,7 +3,12 @@ from . bl_ui_widget import *
 
 import blf
 
+from . bl_ui_text_metrics import text_metrics
+
 class BL_UI_Label(BL_UI_Widget):
+
+    # Labels only draw text
+    static_panel = False
     
     def __init__(self, x, y, width, height, use_ui_scale=False):
         super().__init__(x, y, width, height)
@@ -33,6 +38,7 @@ class BL_UI_Label(BL_UI_Widget):
     @text.setter
     def text(self, value):
         self._text = value
+        self.invalidate()
 
     @property
     def text_size(self):
@@ -48,8 +54,8 @@ class BL_UI_Label(BL_UI_Widget):
     def draw(self):
         area_height = self.get_area_height()
 
-        blf.size(0, self._text_size, 72)
-        size = blf.dimensions(0, self._text)
+        text_metrics.size(0, self._text_size, 72)
+        size = text_metrics.dimensions(0, self._text)
     
         textpos_y = area_height - self.y_screen - self.height
         blf.position(0, self.x_screen, textpos_y, 0)
@@ -0,0 +1,163 @@
+import weakref
+
+
+def freeze(value):
+    """ Hashable, comparable copy of batch content made of tuples, lists, dicts and arrays. """
+
+    if hasattr(value, "tobytes"):
+        return (value.shape, value.dtype.str, value.tobytes())
+
+    if isinstance(value, dict):
+        return tuple((key, freeze(val)) for key, val in sorted(value.items()))
+
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(val) for val in value)
+
+    return value
+
+
+def rect_vertices(x, y, width, height):
+    """ Corners of a rectangle with its top left corner at (x, y) in region space.
+
+        bottom left, top left, top right, bottom right
+    """
+
+    return ((x, y),
+            (x, y - height),
+            (x + width, y - height),
+            (x + width, y))
+
+
+def rects_overlap(a, b):
+    """ Whether two rectangles from rect_vertices overlap. Rectangles that only touch don't. """
+
+    (a_left, a_top), _, (a_right, a_bottom), _ = a
+    (b_left, b_top), _, (b_right, b_bottom), _ = b
+    return a_left < b_right and b_left < a_right and a_bottom < b_top and b_bottom < a_top
+
+
+def merge_rects(rects):
+    """ Content of a single 'TRIS' batch for the 2D_FLAT_COLOR shader that draws all the rectangles.
+
+        Args:
+            rects: Iterable of (vertices, color) pairs. vertices are the four corners from rect_vertices.
+
+        Returns:
+            A (content, indices) tuple. The rectangles are drawn in order.
+    """
+
+    positions = []
+    colors = []
+    indices = []
+    for vertices, color in rects:
+        i = len(positions)
+        positions.extend(vertices)
+        colors.extend((color,) * 4)
+        indices.extend(((i, i + 1, i + 2), (i, i + 2, i + 3)))
+
+    return {"pos": positions, "color": colors}, indices
+
+
+def get_draw_runs(widgets):
+    """ Split widgets into runs that are drawn one after the other, to keep the order of the widgets.
+
+        A run starts with static panels that don't overlap each other, drawn by one merged batch before the widgets
+        of the run. Drawing them first can't change what covers what.
+
+        Returns:
+            A list of (widgets, rects) tuples, with the panel rectangles of the merged widgets of each run.
+    """
+
+    runs = []
+    run_widgets, rects = [], []
+    for widget in widgets:
+        if not widget.merged:
+            run_widgets.append(widget)
+            continue
+
+        rect = widget.panel_rect()
+        # A panel after a widget that draws itself, or on top of a panel of the run, starts a new run
+        if len(run_widgets) > len(rects) or any(rects_overlap(rect[0], other[0]) for other in rects):
+            runs.append((run_widgets, rects))
+            run_widgets, rects = [], []
+
+        run_widgets.append(widget)
+        rects.append(rect)
+
+    if run_widgets:
+        runs.append((run_widgets, rects))
+
+    return runs
+
+
+class BL_UI_Render_Cache:
+    """ One shader per builtin type, shared by all widgets, and batches that are only rebuilt when their geometry changes.
+
+        The gpu module and batch_for_shader are imported on first use. Pass stand-ins to build batches without Blender.
+    """
+
+    def __init__(self, gpu_module=None, batch_func=None):
+        self._gpu = gpu_module
+        self._batch_for_shader = batch_func
+
+        self._shaders = {}
+        # owner -> {part: (geometry, batch)}. Entries go away with their widget.
+        self._batches = weakref.WeakKeyDictionary()
+
+        # Number of batches built, to check the cache hits
+        self.builds = 0
+
+    def shader(self, name):
+        shader = self._shaders.get(name)
+        if shader is None:
+            if self._gpu is None:
+                import gpu
+                self._gpu = gpu
+
+            shader = self._shaders[name] = self._gpu.shader.from_builtin(name)
+
+        return shader
+
+    def batch(self, owner, part, shader_name, type, content, indices=None):
+        """ The batch of one part of a widget. It is rebuilt only if the shader, type, content or indices changed. """
+
+        geometry = (shader_name, type, freeze(content), freeze(indices))
+
+        parts = self._batches.setdefault(owner, {})
+        cached = parts.get(part)
+        if cached is not None and cached[0] == geometry:
+            return cached[1]
+
+        if self._batch_for_shader is None:
+            from gpu_extras.batch import batch_for_shader
+            self._batch_for_shader = batch_for_shader
+
+        shader = self.shader(shader_name)
+        if indices is None:
+            batch = self._batch_for_shader(shader, type, content)
+        else:
+            batch = self._batch_for_shader(shader, type, content, indices=indices)
+
+        self.builds += 1
+        parts[part] = (geometry, batch)
+        return batch
+
+    def discard(self, owner, part=None):
+        """ Forget the batches of a widget, or only one of its parts. """
+
+        parts = self._batches.get(owner)
+        if parts is None:
+            return
+
+        if part is None:
+            del self._batches[owner]
+        else:
+            parts.pop(part, None)
+
+    def clear(self):
+        self._shaders.clear()
+        self._batches.clear()
+
+
+# Shared by all widgets
+render_cache = BL_UI_Render_Cache()
@@ -2,7 +2,11 @@ from . bl_ui_widget import *
 
 import blf
 
+from . bl_ui_text_metrics import text_metrics
+
 class BL_UI_Slider(BL_UI_Widget):
+
+    static_panel = False
     
     def __init__(self, x, y, width, height):
         super().__init__(x, y, width, height)
@@ -136,10 +140,10 @@ class BL_UI_Slider(BL_UI_Widget):
         
         # Draw value text
         sFormat = "{:0." + str(self._decimals) + "f}"
-        blf.size(0, self._text_size, 72)
+        text_metrics.size(0, self._text_size, 72)
         
         sValue = sFormat.format(self.__slider_value)
-        size = blf.dimensions(0, sValue)
+        size = text_metrics.dimensions(0, sValue)
                       
         blf.position(0, self.__slider_pos + 1 + self.x_screen - size[0] / 2.0, 
                         area_height - self.y_screen + self.__slider_offset_y, 0)
@@ -150,7 +154,7 @@ class BL_UI_Slider(BL_UI_Widget):
         if self._show_min_max:
             sMin = sFormat.format(self._min)
             
-            size = blf.dimensions(0, sMin)
+            size = text_metrics.dimensions(0, sMin)
                         
             blf.position(0, self.x_screen - size[0] / 2.0, 
                             area_height - self.height - self.y_screen, 0)
@@ -158,7 +162,7 @@ class BL_UI_Slider(BL_UI_Widget):
 
             sMax = sFormat.format(self._max)
             
-            size = blf.dimensions(0, sMax)
+            size = text_metrics.dimensions(0, sMax)
 
             r, g, b, a = self._text_color
             blf.color(0, r, g, b, a)
@@ -194,9 +198,10 @@ class BL_UI_Slider(BL_UI_Widget):
                     (pos_x + w, pos_y - h)
                    )
                     
-        self.shader = gpu.shader.from_builtin('2D_UNIFORM_COLOR')
-        self.batch_slider = batch_for_shader(self.shader, 'TRIS', 
+        self.shader = render_cache.shader('2D_UNIFORM_COLOR')
+        self.batch_slider = render_cache.batch(self, "slider", '2D_UNIFORM_COLOR', 'TRIS', 
         {"pos" : vertices}, indices=indices)
+        self.invalidate()
         
     def update(self, x, y): 
 
@@ -225,7 +230,7 @@ class BL_UI_Slider(BL_UI_Widget):
         )
 
 
-        self.batch_bg = batch_for_shader(self.shader, 'TRIS', {"pos" : vertices}, indices=indices)
+        self.batch_bg = render_cache.batch(self, "bg", '2D_UNIFORM_COLOR', 'TRIS', {"pos" : vertices}, indices=indices)
  
     def set_value_change(self, value_change_func):
         self.value_change_func = value_change_func
@@ -267,6 +272,7 @@ class BL_UI_Slider(BL_UI_Widget):
 
             if self.context is not None:
                 self.update_slider()
+            self.invalidate()
 
 
     def __set_slider_pos(self, x):
@@ -287,9 +293,14 @@ class BL_UI_Slider(BL_UI_Widget):
             except:
                 pass
                  
+    def set_state(self, state):
+        if state != self.__state:
+            self.__state = state
+            self.invalidate()
+
     def mouse_down(self, x, y):    
         if self.is_in_rect(x,y):
-            self.__state = 1
+            self.set_state(1)
             self.__is_drag = True
                 
             return True
@@ -301,14 +312,14 @@ class BL_UI_Slider(BL_UI_Widget):
             if(self.__state != 1):
                 
                 # hover state
-                self.__state = 2
+                self.set_state(2)
         else:
-            self.__state = 0
+            self.set_state(0)
         
         if self.__is_drag:
             self.__set_slider_pos(x)
             self.update(self.x_screen, self.y_screen)
  
     def mouse_up(self, x, y):
-        self.__state = 0
+        self.set_state(0)
         self.__is_drag = False
\ No newline at end of file
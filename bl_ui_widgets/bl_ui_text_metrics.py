@@ -0,0 +1,69 @@
+from collections import OrderedDict
+
+
+class BL_UI_Text_Metrics:
+    """ Memoized blf.dimensions.
+
+        blf measures with the size last set on the font, so sizes have to be set through size() for the
+        measurements to be keyed by font id, size, dpi and text. The least recently used entries are evicted
+        once max_entries is reached.
+
+        blf is imported on first use. Pass a stand-in to measure without Blender.
+    """
+
+    def __init__(self, max_entries=1024, blf_module=None):
+        self.max_entries = max_entries
+        self._blf = blf_module
+
+        # font id -> (size, dpi) last set through size()
+        self._font_sizes = {}
+        self._dimensions = OrderedDict()
+
+        # Number of blf.dimensions calls, to check the cache hits
+        self.misses = 0
+
+    @property
+    def blf(self):
+        if self._blf is None:
+            import blf
+            self._blf = blf
+
+        return self._blf
+
+    def size(self, font_id, size, dpi=72):
+        """ Set the size of a font for drawing and measuring. """
+
+        self.blf.size(font_id, size, dpi)
+        self._font_sizes[font_id] = (size, dpi)
+
+    def dimensions(self, font_id, text):
+        """ Width and height of the text with the size last set through size(). """
+
+        font_size = self._font_sizes.get(font_id)
+        if font_size is None:
+            # Unknown size, measure with whatever blf has
+            self.misses += 1
+            return self.blf.dimensions(font_id, text)
+
+        key = (font_id, *font_size, text)
+        dimensions = self._dimensions.get(key)
+        if dimensions is not None:
+            self._dimensions.move_to_end(key)
+            return dimensions
+
+        self.misses += 1
+        # The font is shared with Blender and other addons, which may have changed its size since size() was called
+        self.blf.size(font_id, *font_size)
+        dimensions = self._dimensions[key] = self.blf.dimensions(font_id, text)
+        if len(self._dimensions) > self.max_entries:
+            self._dimensions.popitem(last=False)
+
+        return dimensions
+
+    def clear(self):
+        self._font_sizes.clear()
+        self._dimensions.clear()
+
+
+# Shared by all widgets
+text_metrics = BL_UI_Text_Metrics()
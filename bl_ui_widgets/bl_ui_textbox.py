@@ -3,6 +3,8 @@ from . bl_ui_widget import *
 import blf
 import bpy
 
+from . bl_ui_text_metrics import text_metrics
+
 
 class BL_UI_Textbox(BL_UI_Widget):
 
@@ -99,7 +101,7 @@ class BL_UI_Textbox(BL_UI_Widget):
     def update_label(self):
         y_screen_flip = self.get_area_height() - self.y_screen
 
-        size = blf.dimensions(0, self._label)
+        size = text_metrics.dimensions(0, self._label)
 
         self._label_width = size[0] + 12
 
@@ -110,7 +112,7 @@ class BL_UI_Textbox(BL_UI_Widget):
                     (self.x_screen + self.width + self._label_width, y_screen_flip - self.height),
                     (self.x_screen, y_screen_flip - self.height))
                     
-        self.batch_outline = batch_for_shader(self.shader, 'LINE_LOOP', {"pos" : vertices_outline})
+        self.batch_outline = render_cache.batch(self, "outline", '2D_UNIFORM_COLOR', 'LINE_LOOP', {"pos" : vertices_outline})
 
         indices = ((0, 1, 2), (2, 3, 1))
 
@@ -123,7 +125,8 @@ class BL_UI_Textbox(BL_UI_Widget):
                     (lb_x, y_screen_flip - self.height),
                     (lb_x + self._label_width, y_screen_flip - self.height))
                     
-        self.batch_label_bg = batch_for_shader(self.shader, 'TRIS', {"pos" : vertices_label_bg}, indices=indices)
+        self.batch_label_bg = render_cache.batch(self, "label_bg", '2D_UNIFORM_COLOR', 'TRIS', {"pos" : vertices_label_bg}, indices=indices)
+        self.invalidate()
 
 
 
@@ -132,8 +135,8 @@ class BL_UI_Textbox(BL_UI_Widget):
     #     self.update_carret()
 
     def get_carret_pos_px(self):
-        size_all = blf.dimensions(0, self._text)
-        size_to_carret = blf.dimensions(0, self._text[:self._carret_pos])
+        size_all = text_metrics.dimensions(0, self._text)
+        size_to_carret = text_metrics.dimensions(0, self._text[:self._carret_pos])
         return self.x_screen + (self.width / 2.0) - (size_all[0] / 2.0) + size_to_carret[0]
 
     def update_carret(self):
@@ -147,8 +150,9 @@ class BL_UI_Textbox(BL_UI_Widget):
             (x, y_screen_flip - self.height + 6)
         )
 
-        self.batch_carret = batch_for_shader(
-            self.shader, 'LINES', {"pos": vertices})
+        self.batch_carret = render_cache.batch(
+            self, "carret", '2D_UNIFORM_COLOR', 'LINES', {"pos": vertices})
+        self.invalidate()
 
     def draw(self):
 
@@ -172,7 +176,7 @@ class BL_UI_Textbox(BL_UI_Widget):
 
             self.batch_label_bg.draw(self.shader)
 
-            size = blf.dimensions(0, self._label)
+            size = text_metrics.dimensions(0, self._label)
 
             textpos_y = area_height - self.y_screen - (self.height + size[1]) / 2.0
             blf.position(0, self.x_screen + self.width + (self._label_width / 2.0) - (size[0]  / 2.0), textpos_y + 1, 0)
@@ -189,8 +193,8 @@ class BL_UI_Textbox(BL_UI_Widget):
         self.shader.uniform_float("color", color)
 
     def draw_text(self, area_height):
-        blf.size(0, self._text_size, 72)
-        size = blf.dimensions(0, self._text)
+        text_metrics.size(0, self._text_size, 72)
+        size = text_metrics.dimensions(0, self._text)
 
         textpos_y = area_height - self._textpos[1] - (self.height + size[1]) / 2.0
         blf.position(0, self._textpos[0] + (self.width - size[0]) / 2.0, textpos_y + 1, 0)
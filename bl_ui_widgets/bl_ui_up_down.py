@@ -2,7 +2,11 @@ from . bl_ui_widget import *
 
 import blf
 
+from . bl_ui_text_metrics import text_metrics
+
 class BL_UI_Up_Down(BL_UI_Widget):
+
+    static_panel = False
     
     def __init__(self, x, y):
 
@@ -133,10 +137,10 @@ class BL_UI_Up_Down(BL_UI_Widget):
         
         # Draw value text
         sFormat = "{:0." + str(self._decimals) + "f}"
-        blf.size(0, self._text_size, 72)
+        text_metrics.size(0, self._text_size, 72)
         
         sValue = sFormat.format(self.__up_down_value)
-        size = blf.dimensions(0, sValue)
+        size = text_metrics.dimensions(0, sValue)
 
         y_pos = area_height - self.y_screen - size[1] - 2
         x_pos = self.x_screen + 2 * self.__up_down_width + 10
@@ -178,9 +182,10 @@ class BL_UI_Up_Down(BL_UI_Widget):
                     
                    )
                     
-        self.shader = gpu.shader.from_builtin('2D_UNIFORM_COLOR')
-        self.batch_up = batch_for_shader(self.shader, 'TRIS', {"pos" : vertices_up})
-        self.batch_down = batch_for_shader(self.shader, 'TRIS', {"pos" : vertices_down})
+        self.shader = render_cache.shader('2D_UNIFORM_COLOR')
+        self.batch_up = render_cache.batch(self, "up", '2D_UNIFORM_COLOR', 'TRIS', {"pos" : vertices_up})
+        self.batch_down = render_cache.batch(self, "down", '2D_UNIFORM_COLOR', 'TRIS', {"pos" : vertices_down})
+        self.invalidate()
         
     def update(self, x, y): 
 
@@ -231,20 +236,26 @@ class BL_UI_Up_Down(BL_UI_Widget):
 
         if value != self.__up_down_value:
             self.__up_down_value = round(value, self._decimals)
+            self.invalidate()
 
             try:
                 self.value_change_func(self, self.__up_down_value)
             except:
                 pass
                  
+    def set_state(self, state):
+        if state != self.__state:
+            self.__state = state
+            self.invalidate()
+
     def mouse_down(self, x, y):    
         if self.is_in_up(x,y):
-            self.__state = 1
+            self.set_state(1)
             self.inc_value()
             return True
 
         if self.is_in_down(x,y):
-            self.__state = 3
+            self.set_state(3)
             self.dec_value()
             return True
         
@@ -261,16 +272,16 @@ class BL_UI_Up_Down(BL_UI_Widget):
             if(self.__state != 1):
                 
                 # hover state
-                self.__state = 2
+                self.set_state(2)
 
         elif self.is_in_down(x,y):
             if(self.__state != 3):
                 
                 # hover state
-                self.__state = 4
+                self.set_state(4)
 
         else:
-            self.__state = 0
+            self.set_state(0)
  
     def mouse_up(self, x, y):
-        self.__state = 0
\ No newline at end of file
+        self.set_state(0)
\ No newline at end of file
@@ -3,7 +3,13 @@ import bgl
 
 from gpu_extras.batch import batch_for_shader
 
+from . bl_ui_render_cache import render_cache, rect_vertices
+
 class BL_UI_Widget:
+
+    # The background panel only depends on the location, size and bg_color.
+    # The draw operator merges such panels into one batch.
+    static_panel = True
     
     def __init__(self, x, y, width, height):
         self.x = x
@@ -17,6 +23,10 @@ class BL_UI_Widget:
         self.context = None
         self.__inrect = False
         self._mouse_down = False
+        # The panel is drawn by a merged batch
+        self.merged = False
+        # Something drawn changed since the last redraw
+        self.needs_redraw = True
 
     def set_location(self, x, y):
         self.x = x
@@ -32,6 +42,7 @@ class BL_UI_Widget:
     @bg_color.setter
     def bg_color(self, value):
         self._bg_color = value
+        self.invalidate()
 
     @property
     def tag(self):
@@ -40,8 +51,15 @@ class BL_UI_Widget:
     @tag.setter
     def tag(self, value):
         self._tag = value
+
+    def invalidate(self):
+        """ Request a redraw of the region. The draw operator redraws after handling the event. """
+        self.needs_redraw = True
                 		    
     def draw(self):
+        if self.merged:
+            return
+
         self.shader.bind()
         self.shader.uniform_float("color", self._bg_color)
         
@@ -49,6 +67,11 @@ class BL_UI_Widget:
         self.batch_panel.draw(self.shader) 
         bgl.glDisable(bgl.GL_BLEND)
 
+    def panel_rect(self):
+        """ The corners and the color of the background panel. """
+        y_screen_flip = self.get_area_height() - self.y_screen
+        return rect_vertices(self.x_screen, y_screen_flip, self.width, self.height), self._bg_color
+
     def init(self, context):
         self.context = context
         self.update(self.x, self.y)
@@ -65,14 +88,11 @@ class BL_UI_Widget:
         y_screen_flip = area_height - self.y_screen
 
         # bottom left, top left, top right, bottom right
-        vertices = (
-                    (self.x_screen, y_screen_flip), 
-                    (self.x_screen, y_screen_flip - self.height), 
-                    (self.x_screen + self.width, y_screen_flip - self.height),
-                    (self.x_screen + self.width, y_screen_flip))
+        vertices = rect_vertices(self.x_screen, y_screen_flip, self.width, self.height)
                     
-        self.shader = gpu.shader.from_builtin('2D_UNIFORM_COLOR')
-        self.batch_panel = batch_for_shader(self.shader, 'TRIS', {"pos" : vertices}, indices=indices)
+        self.shader = render_cache.shader('2D_UNIFORM_COLOR')
+        self.batch_panel = render_cache.batch(self, "panel", '2D_UNIFORM_COLOR', 'TRIS', {"pos" : vertices}, indices=indices)
+        self.invalidate()
     
     def handle_event(self, event):
         x = event.mouse_region_x
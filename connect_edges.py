@@ -1,22 +1,25 @@
 from typing import *
+from time import perf_counter
 from traceback import print_exc
-from collections import defaultdict
 
 import bpy
 import bmesh
-from bpy.props import IntProperty, EnumProperty
-from bmesh.types import *
-from mathutils import Vector
-
-from .ui import TextLayoutPanel, TextLabelProperty, TextLabel, TextBox, header
-from .utils import (bmesh_face_loop_walker,
-                    bmesh_edge_ring_walker,
-                    bmesh_subdivide_edge,
-                    scale_verts_along_edge,
-                    ensure,
+import numpy as np
+from bpy.props import IntProperty, FloatProperty, EnumProperty, StringProperty
+from bpy_extras import view3d_utils
+from mathutils import Vector, Matrix
+
+from .connector import EdgeConnector
+from .ui import TextLayoutPanel, TextLabelProperty, TextLabel, TextBox, header, draw_polyline, draw_lines
+from .bl_ui_widgets.bl_ui_draw_op import draw_widgets, merge_panels
+from .utils import (bmesh_edge_ring_walker,
                     clamp,
-                    get_perc_along,
+                    project_to_region,
                     get_addon_prefs,
+                    group_objects_by_mesh,
+                    suspend_modifiers,
+                    restore_modifiers,
+                    get_edge_segments,
                     Event)
 
 
@@ -28,46 +31,87 @@ class MESH_OT_ConnectEdges(bpy.types.Operator):
 
     xsegments: IntProperty(name="Segments", default=1, min=1)
     xpinch: IntProperty(name="Pinch", default=0, min=-100, max=100)
-    xeven: EnumProperty(name="Even", items=[("NO", "No", "", 1), ("IN", "Inside", "", 2), ("OUT", "Outside", "", 3)],
+    xeven: EnumProperty(name="Even", items=[("NO", "No", "", 1), ("IN", "Inside", "", 2), ("OUT", "Outside", "", 3),
+                                            ("RING_IN", "Inside per Ring", "", 4),
+                                            ("RING_OUT", "Outside per Ring", "", 5)],
                         default="NO")
+    xslide: FloatProperty(name="Slide", default=0.0, min=-1.0, max=1.0, precision=2)
+    xspacing: FloatProperty(name="Spacing", default=0.0, min=0.0, subtype='DISTANCE',
+                            description="Distance between the new edges. Each strip of faces gets its own number of "
+                                        "segments. Segments are used at 0")
+    xsegments_source: EnumProperty(name="Segments From",
+                                   items=[("NONE", "Segments", "Use the same number of segments everywhere", 1),
+                                          ("CREASE", "Crease", "A crease of 0.1 per segment", 2),
+                                          ("ATTRIBUTE", "Attribute", "An edge attribute with the number of segments",
+                                           3)],
+                                   default="NONE",
+                                   description="Read the number of segments of each strip of faces from its edges. "
+                                               "Strips without a count use Segments")
+    xsegments_attribute: StringProperty(name="Attribute", default="segments",
+                                        description="Edge attribute with the number of segments")
 
     # Enum value lookup
-    even_enum_val = {0: 'NO', 1: 'IN', 2: 'OUT'}
+    even_enum_val = {0: 'NO', 1: 'IN', 2: 'OUT', 3: 'RING_IN', 4: 'RING_OUT'}
     # Enum index lookup
     even_enum_idx = {val: key for key, val in even_enum_val.items()}
 
-    # Unmodifed bmesh data used to initialize
-    initial_bm = None
     draw_handle_hud = None
     hud = None
+    # Seconds without continuous input before a deferred rebuild runs
+    settle_delay = 0.2
+    # Factor the spacing changes by on each mouse wheel step
+    spacing_step = 1.25
     # Event Object
     subject = None
 
     def __init__(self):
 
-        # Bmesh to modify
-        self.bm = None
-       
-        # Map each face to its selected edges
-        # Once these edges are sub'd the indices are no longer considered valid
-        self.edges_lookup: Dict[int, List[int]] = {}
+        # One connector per unique mesh in edit mode
+        self.connectors: List[EdgeConnector] = []
+
+        # Only draw the cuts until the operator is confirmed
+        self.preview = False
+        # World space end points of the previewed cuts, two per edge
+        self.preview_lines = None
+
+        # --For Adaptive Quality--
+
+        # Frame budget in seconds. Slower updates are previewed during continuous input
+        self.frame_budget = 0.0
+        # Duration of the last rebuild and the last pinch in seconds
+        self.rebuild_time = 0.0
+        self.pinch_time = 0.0
+        # Deferred update. None, 'PINCH' or 'CUTS'
+        self.pending = None
+        # Time of the last continuous input
+        self.last_input = 0.0
+        # Timer that checks whether the input settled
+        self.settle_timer = None
+
+        # (object, modifier name) pairs hidden in edit mode for the session
+        self.suspended_modifiers = []
+
+        # --Preferences, read once at invoke--
+        self.mouse_select = 'LEFTMOUSE'
+        self.mouse_menu = 'RIGHTMOUSE'
+        self.use_selection = False
+        self.hover_highlight = False
+        self.show_hud = False
+
+        # Something drawn changed since the last redraw
+        self.dirty = True
 
-        # Map a selected edge to it's start and end vertex coordinates
-        self.edge_vert_pair = {}
-
-        # Ordered edges->List of vertices in ccw order
-        self.ordered_verts: DefaultDict[int, List[int]] = defaultdict(list)
-
-        # Original coordinates of a vertex
-        self.orig_vert_coords = {}
-
-        self.min_length = float('INF')
         self.start_mouse_pos = Vector()
         self.prev_pinch = 0
 
         # Mouse movement engaged flag
         self.mouse_started = False
 
+        # Slide mode flag, the mouse x position and the slide value when it started
+        self.sliding = False
+        self.slide_start_x = 0
+        self.prev_slide = 0.0
+
         # Text box references
         self.segment_input = None
         self.pinch_input = None
@@ -77,15 +121,14 @@ class MESH_OT_ConnectEdges(bpy.types.Operator):
         # Selection changed flag
         self.selection_changed = False
 
-        # Store the selected edges
-        self.selected_edges = set()
-        # Edges ignored when selected
-        self.ignore_edges = set()
-
-        self.tagged = set()
+        # Running box or lasso selection. None, 'BOX' or 'LASSO'
+        self.gesture = None
+        # Region coordinates of the box corners or the lasso points
+        self.gesture_points = []
 
-        # Maps the currently selected edge to the original edge before it was subdivided
-        self.selected_edge_lookup = {}
+        # The connector and the ring of the edge under the mouse
+        self.hover_connector = None
+        self.hover_ring = None
 
     @property
     def segments(self):
@@ -94,6 +137,7 @@ class MESH_OT_ConnectEdges(bpy.types.Operator):
     @segments.setter
     def segments(self, value):
         self.xsegments = value
+        self.dirty = True
         if self.subject is not None:
             self.subject.notify(self, "Segments", value)
 
@@ -104,6 +148,7 @@ class MESH_OT_ConnectEdges(bpy.types.Operator):
     @pinch.setter
     def pinch(self, value):
         self.xpinch = value
+        self.dirty = True
         if self.subject is not None:
             self.subject.notify(self, "Pinch", value)
 
@@ -114,15 +159,65 @@ class MESH_OT_ConnectEdges(bpy.types.Operator):
     @even.setter
     def even(self, value):
         self.xeven = value
+        self.dirty = True
         if self.subject is not None:
             self.subject.notify(self, "Even", value)
 
-    @classmethod
-    def setup(cls, context):
-        context.active_object.update_from_editmode()
-        mesh = context.active_object.data
-        cls.initial_bm = bmesh.new()
-        cls.initial_bm.from_mesh(mesh)
+    @property
+    def spacing(self):
+        return self.xspacing
+
+    @spacing.setter
+    def spacing(self, value):
+        self.xspacing = value
+        self.dirty = True
+        if self.subject is not None:
+            self.subject.notify(self, "Spacing", value)
+
+    def get_segments(self, connector):
+        """ The number of segments for a connector, per edge when they are read from the edges or spaced by distance. """
+        if connector.edge_segments is not None:
+            return connector.get_strip_segments(connector.edge_segments, self.segments)
+        if self.spacing > 0:
+            return connector.get_spacing_segments(self.spacing)
+        return self.segments
+
+    @property
+    def slide(self):
+        return self.xslide
+
+    @slide.setter
+    def slide(self, value):
+        self.xslide = value
+        self.dirty = True
+        if self.subject is not None:
+            self.subject.notify(self, "Slide", value)
+
+    def setup(self, context):
+        # Linked duplicates share one edit mesh. Connect each mesh once, through its first user.
+        self.connectors = [EdgeConnector(users[0], users)
+                           for users in group_objects_by_mesh(context.objects_in_mode).values()]
+        missing = []
+        for connector in self.connectors:
+            connector.setup()
+            if self.xsegments_source != 'NONE':
+                attribute = self.xsegments_attribute if self.xsegments_source == 'ATTRIBUTE' else None
+                connector.edge_segments = get_edge_segments(connector.mesh, attribute)
+                # A mesh without crease data reads as no crease, only a missing attribute gives None. It is likely a typo.
+                if connector.edge_segments is None and attribute is not None:
+                    missing.append(connector.mesh.name)
+
+        if missing:
+            self.report({'WARNING'}, "Edge attribute '{0}' not found on {1}, using Segments".format(
+                self.xsegments_attribute, ", ".join(missing)))
+
+        self.prepare(self.connectors)
+
+    @staticmethod
+    def prepare(connectors):
+        """ Prepare the connectors one after the other. Preparing walks bmesh data, which must stay on the main thread. """
+        for connector in connectors:
+            connector.prepare()
 
     @classmethod
     def poll(cls, context):
@@ -132,9 +227,10 @@ class MESH_OT_ConnectEdges(bpy.types.Operator):
 
     def set_header(self, context):
         header_text = header(
-            f'Segments: {self.segments}',
+            f'Spacing: {self.spacing:.3f}' if self.spacing > 0 else f'Segments: {self.segments}',
             f'Pinch: {self.pinch}',
-            f'Even: {self.even}'
+            f'Even: {self.even}',
+            f'Slide: {self.slide:.2f}'
         )
 
         context.area.header_text_set(header_text)
@@ -144,27 +240,35 @@ class MESH_OT_ConnectEdges(bpy.types.Operator):
         col = layout.column()
         row = col.row()
         row.prop(self, "xsegments")
+        # Strips without a count from their edges use Segments
+        row.enabled = self.xspacing == 0 or self.xsegments_source != 'NONE'
+
+        row4 = col.row()
+        row4.prop(self, "xspacing")
+        row4.enabled = self.xsegments_source == 'NONE'
+
+        col.prop(self, "xsegments_source")
+        row5 = col.row()
+        row5.prop(self, "xsegments_attribute")
+        row5.enabled = self.xsegments_source == 'ATTRIBUTE'
 
         row2 = col.row()
         row2.prop(self, "xpinch", slider=True)
+
+        row3 = col.row()
+        row3.prop(self, "xslide", slider=True)
         
     def selection_enabled(self, context):
-        return get_addon_prefs(context).selection_enabled
+        return self.use_selection
 
     def execute(self, context):
 
         self.setup(context)
-        self.selected_edges.clear()
-
-        self.initial_bm.select_mode = {'EDGE'}
-        ensure(self.initial_bm)
-        for bm_edge in self.initial_bm.edges:
-            if bm_edge.select:
-                self.selected_edges.add(bm_edge.index)
-                bm_edge.select_set(False)
+        if self.connect_edges(context) == {'CANCELLED'}:
+            return {'CANCELLED'}
 
-        self.initial_bm.select_flush_mode()
-        self.connect_edges(context)
+        self.interpolate_attributes()
+        self.clear()
         return {'FINISHED'}
 
     def init_hud(self, context):
@@ -190,9 +294,19 @@ class MESH_OT_ConnectEdges(bpy.types.Operator):
                                       self.even, lambda new_val: "Even: {0}".format(new_val), use_ui_scale=use_ui_scale,
                                       hotkey_hint="(E)", show_hotkeys=show_keys)
         
+        draw_slide = TextLabelProperty(0, 0, 50, 16, scale_fac, context,
+                                       self.slide, lambda new_val: "Slide: {0:.2f}".format(new_val), use_ui_scale=use_ui_scale,
+                                       hotkey_hint="(G)", show_hotkeys=show_keys)
+
+        draw_spacing = TextLabelProperty(0, 0, 50, 16, scale_fac, context,
+                                         self.spacing, lambda new_val: "Spacing: {0:.3f}".format(new_val) if new_val > 0 else "Spacing: Off",
+                                         use_ui_scale=use_ui_scale, hotkey_hint="(CTRL + MouseWheel)", show_hotkeys=show_keys)
+        
         self.hud.register("Pinch", draw_pinch)
         self.hud.register("Segments", draw_segs)
+        self.hud.register("Spacing", draw_spacing)
         self.hud.register("Even", draw_even)
+        self.hud.register("Slide", draw_slide)
 
         if show_keys:
             key_text = "Confirm (Space) Cancel (ESC)"
@@ -208,20 +322,65 @@ class MESH_OT_ConnectEdges(bpy.types.Operator):
 
     def invoke(self, context, event):
         addon_prefs = get_addon_prefs(context)
-        if addon_prefs.show_hud:
+        self.mouse_select = addon_prefs.get_mouse_select_button()
+        self.mouse_menu = addon_prefs.get_mouse_select_button(True)
+        self.use_selection = addon_prefs.selection_enabled
+        self.hover_highlight = addon_prefs.hover_highlight
+        self.show_hud = addon_prefs.show_hud
+
+        if self.show_hud:
             self.init_hud(context)
 
-        self.execute(context)
+        self.preview = addon_prefs.preview_cuts
+        self.frame_budget = addon_prefs.frame_budget / 1000
+
+        if addon_prefs.suspend_modifiers:
+            self.suspended_modifiers = suspend_modifiers(context.evaluated_depsgraph_get(), context.objects_in_mode,
+                                                         addon_prefs.suspend_types, addon_prefs.suspend_time / 1000)
+        try:
+            self.setup(context)
+            if self.preview:
+                self.update_preview()
+            elif self.connect_edges(context) == {'CANCELLED'}:
+                return {'CANCELLED'}
+        except BaseException:
+            # The modal never starts, so nothing else would bring the modifiers back
+            self.clear()
+            self.restore_modifiers()
+            raise
         context.window_manager.modal_handler_add(self)
         args = (self, context)
         self.register_handlers(args, context)
+        self.refresh(context)
         return {'RUNNING_MODAL'}
 
-    def modal(self, context, event):
-        addon_prefs = get_addon_prefs(context)
-        mouse_select = addon_prefs.get_mouse_select_button()
+    def refresh(self, context):
+        """ Redraw the viewport and update the header, if something changed. """
+
+        if not self.dirty:
+            return
+
         if context.area:
             context.area.tag_redraw()
+            if not self.show_hud:
+                self.set_header(context)
+
+        self.dirty = False
+
+    def modal(self, context, event):
+        result = self.handle_event(context, event)
+        if 'RUNNING_MODAL' in result:
+            self.refresh(context)
+
+        return result
+
+    def handle_event(self, context, event):
+        mouse_select = self.mouse_select
+
+        if event.type == 'TIMER':
+            if self.pending is not None and perf_counter() - self.last_input >= self.settle_delay:
+                return self.settle(context)
+            return {'PASS_THROUGH'}
 
         if self.segment_input is not None and self.pinch_input is not None:
 
@@ -234,56 +393,62 @@ class MESH_OT_ConnectEdges(bpy.types.Operator):
 
             if not handled and event.type == mouse_select and event.value == 'PRESS':
                 self.close_input()
+                handled = True
 
+            self.dirty |= handled
             return {'RUNNING_MODAL'}
 
-        if self.selection_enabled(context):
-            if event.type == mouse_select:
+        if self.gesture is not None:
+            return self.modal_gesture(context, event)
+
+        if self.sliding:
+            return self.modal_slide(context, event)
+
+        if event.type == 'MOUSEMOVE' and not self.mouse_started and self.hover_highlight \
+                and self.selection_enabled(context):
+            self.update_hover(context, event)
+
+        if self.selection_enabled(context) and event.type == mouse_select:
+            # Edge loop selection is left to Blender
+            if event.alt and not (event.ctrl and event.shift):
                 self.selection_changed = True
                 return {'PASS_THROUGH'}
 
-        if self.selection_changed:
-            context.active_object.update_from_editmode()
-            mesh = context.active_object.data
-            bm = bmesh.new()
-            bm = bmesh.from_edit_mesh(mesh)
-
-            selected = set()
-            deselected = set()
-
-            # Loop through all edges and get the recently selected or deselected edges
-            for bm_edge in bm.edges:
-                edge_idx = bm_edge.index
-                if bm_edge.select and edge_idx not in self.tagged and edge_idx not in self.ignore_edges:
-                    selected.add(edge_idx)
-
-                if not bm_edge.select and edge_idx in self.tagged and edge_idx not in self.ignore_edges:
-                    deselected_edge_idx = None
-
-                    # Check to see if the deselected edge was once created by subdividing an edge
-                    if edge_idx in self.selected_edge_lookup:
-                        deselected_edge_idx = self.selected_edge_lookup[edge_idx]
-                    else:
-                        deselected_edge_idx = edge_idx
+            if event.value == 'PRESS':
+                return self.pick_edges(context, event)
 
-                    deselected.add(deselected_edge_idx)
+            return {'RUNNING_MODAL'}
 
-            if selected or deselected:
-                if len(selected) == 1 and not (event.shift):
-                    edges = [loop.edge.index for loop in bmesh_edge_ring_walker(self.initial_bm.edges[selected.pop()])]
-                    selected.update(edges)
+        if self.selection_changed:
+            changed = []
+            for connector in self.connectors:
+                selected, deselected = connector.scan_selection()
+
+                if selected or deselected:
+                    if len(selected) == 1 and not (event.shift):
+                        edges = [loop.edge.index for loop in bmesh_edge_ring_walker(connector.initial_bm.edges[selected.pop()])]
+                        selected.update(edges)
+
+                    if self.preview:
+                        # Nothing was built yet, so the edit mesh holds the whole selection
+                        connector.selected_edges = selected
+                        connector.edit_selection = set(selected)
+                    else:
+                        connector.selected_edges.update(selected)
+                        connector.selected_edges.difference_update(deselected)
+                    changed.append(connector)
 
-                self.selected_edges.update(selected)
-                self.selected_edges.difference_update(deselected)
+            if changed:
+                self.prepare(changed)
                 self.selection_changed = False
-                
-                return self.connect_edges(context)
+
+                return self.update_cuts(context)
 
         if self.mouse_started and event.type == 'MOUSEMOVE' and not event.alt:
             delta_x = event.mouse_x - self.start_mouse_pos.x
             self.pinch = clamp(-100, self.prev_pinch + int(delta_x / 2), 100)
 
-            self.pinch_edges(context=context, update=True)
+            self.update_pinch(context, continuous=True)
 
         if event.ctrl and not event.alt:
             if not self.mouse_started and event.value == 'PRESS':
@@ -293,20 +458,37 @@ class MESH_OT_ConnectEdges(bpy.types.Operator):
                 self.mouse_started = not self.mouse_started
 
             if event.type == 'WHEELUPMOUSE':
-                self.segments += 1
-                return self.connect_edges(context)
+                if self.spacing > 0:
+                    # More segments
+                    self.spacing /= self.spacing_step
+                else:
+                    self.segments += 1
+                return self.update_cuts(context, continuous=True)
 
             elif event.type == 'WHEELDOWNMOUSE':
-                self.segments -= 1
-                return self.connect_edges(context)
+                if self.spacing > 0:
+                    self.spacing *= self.spacing_step
+                else:
+                    self.segments -= 1
+                return self.update_cuts(context, continuous=True)
 
         elif self.mouse_started and not event.ctrl:
             self.prev_pinch = self.pinch
             self.mouse_started = not self.mouse_started
 
-        elif event.type == addon_prefs.get_mouse_select_button(True) and event.value == 'PRESS':
+            # The drag ended
+            if self.pending is not None:
+                return self.settle(context)
+
+        elif event.type == self.mouse_menu and event.value == 'PRESS':
             mouse_pos = Vector((event.mouse_x, event.mouse_y))
             self.open_input(mouse_pos, context)
+            self.dirty = True
+
+        elif self.selection_enabled(context) and event.type in ('B', 'L') and event.value == 'PRESS':
+            self.gesture = 'BOX' if event.type == 'B' else 'LASSO'
+            self.gesture_points = []
+            self.dirty = True
 
         elif event.type == 'MIDDLEMOUSE':
             return {'PASS_THROUGH'}
@@ -326,9 +508,14 @@ class MESH_OT_ConnectEdges(bpy.types.Operator):
             # Get the value associated with an index
             value = self.even_enum_val[(enum_idx + 1) % len(self.even_enum_val)]
             self.even = value
-            self.pinch_edges(context, update=True)
+            self.update_pinch(context)
+
+        elif event.type == 'G' and event.value == 'PRESS' and not event.ctrl:
+            self.sliding = True
+            self.slide_start_x = event.mouse_x
+            self.prev_slide = self.slide
 
-        elif not addon_prefs.selection_enabled and event.type in ('SPACE', mouse_select) and event.value == 'PRESS':
+        elif not self.use_selection and event.type in ('SPACE', mouse_select) and event.value == 'PRESS':
             return self.finish(context)
 
         elif event.type == 'SPACE' and event.value == 'PRESS':
@@ -337,47 +524,293 @@ class MESH_OT_ConnectEdges(bpy.types.Operator):
         elif event.type == 'ESC':  # Cancel
             return self.cancelled(context)
 
-        if not addon_prefs.show_hud:
-            self.set_header(context)
+        return {'RUNNING_MODAL'}
+
+    def pick_edges(self, context, event):
+        """ Update the selection with the edge under the mouse without going through Blender's select operator.
+
+            Click selects the ring of the edge, Shift + Click toggles the edge and
+            CTRL + ALT + Shift + Click adds the ring of the edge.
+        """
+
+        region = context.region
+        rv3d = context.region_data
+        if rv3d is None:
+            return {'RUNNING_MODAL'}
+
+        hit_connector, hit_edge = self.pick(region, rv3d, (event.mouse_region_x, event.mouse_region_y))
+
+        changed = []
+        if event.shift and event.ctrl and event.alt:
+            if hit_connector is not None:
+                hit_connector.selected_edges.update(hit_connector.get_ring(hit_edge))
+                changed.append(hit_connector)
+
+        elif event.shift:
+            if hit_connector is not None:
+                hit_connector.selected_edges.symmetric_difference_update((hit_edge,))
+                changed.append(hit_connector)
+
+        else:
+            # Clicking on nothing clears the selection, like Blender's select operator
+            for connector in self.connectors:
+                if connector is hit_connector:
+                    connector.selected_edges = set(connector.get_ring(hit_edge))
+                    changed.append(connector)
+
+                elif connector.selected_edges:
+                    connector.selected_edges.clear()
+                    changed.append(connector)
+
+        if not changed:
+            return {'RUNNING_MODAL'}
+
+        return self.selection_updated(context, changed)
+
+    def pick(self, region, rv3d, coord):
+        """ Find the edge under a region coordinate, the closest one of all objects.
+
+            Returns:
+                The connector and the index of the edge, or (None, None).
+        """
+
+        origin = view3d_utils.region_2d_to_origin_3d(region, rv3d, coord)
+        direction = view3d_utils.region_2d_to_vector_3d(region, rv3d, coord)
+
+        hit_connector = None
+        hit_edge = None
+        hit_dist = float('INF')
+        for connector in self.connectors:
+            hit = connector.pick(region, rv3d, coord, origin, direction)
+            if hit is not None and hit[0] < hit_dist:
+                hit_dist, hit_edge = hit
+                hit_connector = connector
+
+        return hit_connector, hit_edge
+
+    def update_hover(self, context, event):
+        """ Find the ring that a click would select. """
+
+        region = context.region
+        rv3d = context.region_data
+        if rv3d is None:
+            return
+
+        # The same pick as a click, so the highlight shows what a click selects
+        hover_connector, hover_edge = self.pick(region, rv3d, (event.mouse_region_x, event.mouse_region_y))
+
+        hover_ring = hover_connector.get_ring(hover_edge) if hover_connector is not None else None
+        if hover_ring != self.hover_ring:
+            self.dirty = True
+
+        self.hover_connector = hover_connector
+        self.hover_ring = hover_ring
+
+    def modal_slide(self, context, event):
+        """ Slide the new edges along the connected edges by moving the mouse.
+
+            G, Space or the select button keeps the slide, Escape or the other mouse button resets it.
+        """
+
+        if event.type == 'MOUSEMOVE':
+            delta_x = event.mouse_x - self.slide_start_x
+            slide = round(clamp(-1.0, self.prev_slide + delta_x / 200, 1.0), 2)
+            if slide != self.slide:
+                self.slide = slide
+                self.update_pinch(context, continuous=True)
+
+        elif event.type in ('G', 'SPACE', self.mouse_select) and event.value == 'PRESS':
+            self.sliding = False
+            if self.pending is not None:
+                return self.settle(context)
+
+        elif event.type in ('ESC', self.mouse_menu) and event.value == 'PRESS':
+            self.sliding = False
+            self.slide = self.prev_slide
+            self.update_pinch(context)
+
+        elif event.type in ('MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE'):
+            return {'PASS_THROUGH'}
+
+        return {'RUNNING_MODAL'}
+
+    def modal_gesture(self, context, event):
+        """ Box (B) and lasso (L) selection.
+
+            Drag with the select button to select the edges inside. Shift adds to the selection and CTRL removes from it.
+        """
+
+        mouse_select = self.mouse_select
+        coord = (event.mouse_region_x, event.mouse_region_y)
+
+        if event.type in ('ESC', self.mouse_menu) and event.value == 'PRESS':
+            self.gesture = None
+            self.gesture_points = []
+            self.dirty = True
+
+        elif event.type == mouse_select and event.value == 'PRESS':
+            self.gesture_points = [coord]
+
+        elif event.type == 'MOUSEMOVE' and self.gesture_points:
+            if self.gesture == 'BOX':
+                self.gesture_points[1:] = [coord]
+                self.dirty = True
+            else:
+                # Skip tiny moves to keep the lasso polygon small
+                last_x, last_y = self.gesture_points[-1]
+                if abs(coord[0] - last_x) + abs(coord[1] - last_y) >= 4:
+                    self.gesture_points.append(coord)
+                    self.dirty = True
+
+        elif event.type == mouse_select and event.value == 'RELEASE' and self.gesture_points:
+            gesture = self.gesture
+            points = self.gesture_points
+
+            self.gesture = None
+            self.gesture_points = []
+            self.dirty = True
+
+            if len(points) >= (2 if gesture == 'BOX' else 3):
+                mode = 'ADD' if event.shift else 'SUB' if event.ctrl else 'SET'
+                return self.select_in_region(context, gesture, points, mode)
+
+        elif event.type in ('MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE'):
+            return {'PASS_THROUGH'}
 
         return {'RUNNING_MODAL'}
 
+    def select_in_region(self, context, gesture, points, mode):
+        """ Update the selection with the edges inside a box or lasso.
+
+            Args:
+                gesture: 'BOX' or 'LASSO'.
+                points: Region coordinates of the box corners or the lasso points.
+                mode: 'SET' replaces the selection, 'ADD' adds to it and 'SUB' removes from it.
+        """
+
+        region = context.region
+        rv3d = context.region_data
+        if rv3d is None:
+            return {'RUNNING_MODAL'}
+
+        # Like the native selection, only X-ray reaches the edges behind the surface
+        shading = context.space_data.shading
+        xray = shading.show_xray_wireframe if shading.type == 'WIREFRAME' else shading.show_xray
+
+        changed = []
+        for connector in self.connectors:
+            if gesture == 'BOX':
+                hits = connector.edges_in_region(region, rv3d, box=(points[0], points[-1]), xray=xray)
+            else:
+                hits = connector.edges_in_region(region, rv3d, polygon=points, xray=xray)
+
+            if mode == 'ADD':
+                selected_edges = connector.selected_edges | hits
+            elif mode == 'SUB':
+                selected_edges = connector.selected_edges - hits
+            else:
+                selected_edges = hits
+
+            if selected_edges != connector.selected_edges:
+                connector.selected_edges = selected_edges
+                changed.append(connector)
+
+        if not changed:
+            return {'RUNNING_MODAL'}
+
+        return self.selection_updated(context, changed)
+
+    def selection_updated(self, context, changed) -> str:
+        """ Apply a selection made inside the operator. """
+
+        if self.preview:
+            # Blender's loop select adds to the edit mesh selection, which has to hold the picks
+            for connector in changed:
+                connector.write_selection()
+
+        self.prepare(changed)
+        return self.update_cuts(context)
+
     def finish(self, context):
+        if self.pending is not None and self.settle(context) == {'CANCELLED'}:
+            return {'CANCELLED'}
+
+        if self.preview:
+            # Build the previewed cuts
+            self.preview = False
+            self.preview_lines = None
+            if self.connect_edges(context) == {'CANCELLED'}:
+                return {'CANCELLED'}
+
         context.area.header_text_set(None)
-        mesh = context.active_object.data
-        bmesh.update_edit_mesh(mesh)
+        for connector in self.connectors:
+            bmesh.update_edit_mesh(connector.mesh)
         bpy.ops.mesh.select_all(action='DESELECT')
 
+        # Switching to object and then back to edit also fixes the bmesh has been removed error with some addon that use the bmesh data. (Hacky?) 
+        self.interpolate_attributes()
+
         self.clear()
-        self.bm.free()
-        self.initial_bm.free()
         self.unregister_handlers(context)
+        self.restore_modifiers()
+
+        return {'FINISHED'}
+
+    def interpolate_attributes(self):
+        """ Interpolate the attributes of the new elements through the mesh data. Switches to object mode and back. """
+
+        # The edit bmeshes don't survive the mode switch
+        for connector in self.connectors:
+            if connector.bm is not None:
+                # Vertex groups aren't attributes of the mesh data, they are blended in the edit bmesh
+                connector.interpolate_weights(connector.bm)
+                connector.bm.free()
+                connector.bm = None
 
-        # Switch to object and then back to edit to fix the bmesh has been removed error with some addon that use the bmesh data. (Hacky?) 
         bpy.ops.object.mode_set(mode='OBJECT')
+        for connector in self.connectors:
+            connector.interpolate_attributes(connector.mesh)
         bpy.ops.object.mode_set(mode='EDIT')
 
-        return {'FINISHED'}
-
     def cancelled(self, context):
         context.area.header_text_set(None)
 
-        self.clear()
-        self.bm.free()
+        self.remove_settle_timer(context)
+        self.pending = None
+
+        # Nothing has to be restored if the cuts were only previewed
+        built = any(connector.bm is not None for connector in self.connectors)
+
+        for connector in self.connectors:
+            connector.clear()
+            if connector.bm is not None:
+                connector.bm.free()
+                connector.bm = None
 
         self.selection_changed = False
         self.unregister_handlers(context)
 
-        mesh = context.active_object.data
-        
-        # Restore the edit mesh to the intial state
-        bpy.ops.object.mode_set(mode='OBJECT')
-        self.initial_bm.to_mesh(mesh)
-        bpy.ops.object.mode_set(mode='EDIT')
-        self.initial_bm.free()
+        # Restore the edit meshes to the intial state
+        if built:
+            bpy.ops.object.mode_set(mode='OBJECT')
+            for connector in self.connectors:
+                connector.restore()
+            bpy.ops.object.mode_set(mode='EDIT')
+        elif self.preview:
+            # Only the picks were written to the edit meshes
+            for connector in self.connectors:
+                connector.selected_edges = set(connector.initial_selection)
+                connector.write_selection()
+
+        self.clear()
+        self.restore_modifiers()
 
         return {'CANCELLED'}
 
+    def restore_modifiers(self):
+        restore_modifiers(self.suspended_modifiers)
+        self.suspended_modifiers = []
+
     def open_input(self, mouse_pos, context):
         self.segment_input = TextBox(context, 0, 0, 100, 30, "Segments", 3)
         self.segment_input.text = str(self.segments)
@@ -391,6 +824,9 @@ class MESH_OT_ConnectEdges(bpy.types.Operator):
         self.pinch_input.set_location(mouse_pos.x + 20, context.area.height - mouse_pos.y + 54)
         self.pinch_input.set_text_changed(self.on_pinch_input_changed)
 
+        # Both panels are drawn by one batch, cached with the segment box
+        merge_panels((self.segment_input, self.pinch_input))
+
     def close_input(self):
         self.segment_input = None
         self.pinch_input = None
@@ -402,7 +838,7 @@ class MESH_OT_ConnectEdges(bpy.types.Operator):
             except ValueError:
                 self.report({'ERROR'}, "Please Enter An Integer Value!")
 
-            self.connect_edges(context)
+            self.update_cuts(context)
 
     def on_pinch_input_changed(self, textbox, context, event):
         if textbox.text and textbox.text != "-":
@@ -418,14 +854,43 @@ class MESH_OT_ConnectEdges(bpy.types.Operator):
             else:
                 self.report({'ERROR'}, "Please Enter a Number Between -100 and 100!")
 
-            self.pinch_edges(context=context, update=True)
+            self.update_pinch(context)
 
     def draw_input(self):
         if self.segment_input is not None:
-            self.segment_input.draw()
-            self.pinch_input.draw()
+            draw_widgets(self.segment_input, (self.segment_input, self.pinch_input))
+
+    def draw_gesture(self):
+        points = self.gesture_points
+        if len(points) < 2:
+            return
+
+        if self.gesture == 'BOX':
+            (x1, y1), (x2, y2) = points[0], points[-1]
+            draw_polyline(((x1, y1), (x2, y1), (x2, y2), (x1, y2)), closed=True)
+        else:
+            draw_polyline(points, closed=True)
+
+    def draw_hover(self, context):
+        if self.hover_ring is None or context.region_data is None:
+            return
+
+        lines = self.hover_connector.region_lines(context.region, context.region_data, self.hover_ring)
+        draw_lines(lines, color=(1.0, 0.8, 0.2, 1.0), width=2)
+
+    def draw_preview(self, context):
+        if self.preview_lines is None or len(self.preview_lines) == 0 or context.region_data is None:
+            return
+
+        points, depths = project_to_region(context.region, context.region_data, Matrix.Identity(4),
+                                           self.preview_lines)
+        in_front = np.all(depths.reshape(-1, 2) > 0.0, axis=1)
+        draw_lines(points.reshape(-1, 2, 2)[in_front].reshape(-1, 2), color=(0.3, 0.9, 1.0, 1.0), width=2)
 
     def draw_callback_hud(self, op, context):
+        self.draw_preview(context)
+        self.draw_hover(context)
+        self.draw_gesture()
         self.draw_input()
         if self.hud is not None:
             self.hud.draw()
@@ -442,265 +907,118 @@ class MESH_OT_ConnectEdges(bpy.types.Operator):
     def clear(self):
         """ Clear all the data. """
 
-        self.ordered_verts.clear()
-        self.ignore_edges.clear()
-        self.selected_edge_lookup.clear()
-
-        self.edges_lookup.clear()
-        self.tagged.clear()
-        self.edge_vert_pair.clear()
-        self.orig_vert_coords.clear()
-
-    def create_geometry(self):
-        def order_verts_on_edge(start_co, end_co, verts):
-            bm.verts.ensure_lookup_table()
-            verts.sort(key=lambda x: get_perc_along(start_co, end_co, bm.verts[x].co))
-
-        bm = self.bm
-        num_segs = self.segments
-
-        subdivided_edges = set()
-        for face_idx, edges in self.edges_lookup.items():
-            bm.faces.ensure_lookup_table()
-            for next_loop in bmesh_face_loop_walker(bm.faces[face_idx]):
-                next_edge = next_loop.edge
-                bm.edges.ensure_lookup_table()
-                next_edge_idx = next_edge.index
-
-                start = next_loop.vert
-                end = next_loop.edge.other_vert(next_loop.vert)
-
-                # Subdivide the edge if it was selected and hasn't been subdivided yet
-                if next_edge_idx not in subdivided_edges and next_edge_idx in self.selected_edges:
-                    ret = bmesh_subdivide_edge(bm, bm.edges[next_edge_idx], num_segs)
-
-                    bm.edges.index_update()
-                    new_verts = []
-                    for bm_element in ret:
-                        if isinstance(bm_element, BMVert):
-                            new_verts.append(bm_element.index)
-                            self.orig_vert_coords[bm_element.index] = bm_element.co.copy()
-
-                        elif isinstance(bm_element, BMEdge):
-                            self.tagged.add(bm_element.index)
-                            self.selected_edge_lookup[bm_element.index] = next_edge_idx
-                            bm_element.select = True
-                            #self.bm.select_flush_mode()
-
-                    order_verts_on_edge(start.co, end.co, new_verts)
-
-                    # The edge was sudivivded. Add it to the set.
-                    subdivided_edges.add(next_edge_idx)
-                    self.ordered_verts[next_edge_idx] = new_verts
-
-                # The edge has already been subdivided.
-                # We still need to order the vertices in the ccw direction for the current face
-                elif next_edge_idx in self.selected_edges:
-                    order_verts_on_edge(start.co, end.co, self.ordered_verts[next_edge_idx])
-
-            edgenet = []
-            connected_vert_pairs = set()
-            for i in range(0, len(edges)):
-                # List of indices from vertices that were created from subdividing the edge
-                edge_a = self.ordered_verts[edges[i]]
-                edge_b = self.ordered_verts[edges[(i + 1) % len(edges)]]
-
-                n = int(num_segs / 2) + (num_segs % 2)
-                for j in range(0, n):
-                    vert1_idx = edge_b[j]
-                    vert2_idx = edge_a[-(j + 1)]
-
-                    # Make sure to only create one edge per vertex pair
-                    vert_pair = frozenset([vert1_idx, vert2_idx])
-                    if vert_pair not in connected_vert_pairs:
-                        bm.verts.ensure_lookup_table()
-                        bm_vert_a = bm.verts[edge_b[j]]
-                        bm_vert_b = bm.verts[edge_a[-(j + 1)]]
-
-                        bm_edge = bm.edges.new([bm_vert_a, bm_vert_b])
-
-                        bm.edges.index_update()
-                        edgenet.append(bm_edge)
-                        connected_vert_pairs.add(vert_pair)
-
-                        self.tagged.add(bm_edge.index)
-                        self.ignore_edges.add(bm_edge.index)
-
-            bm.faces.ensure_lookup_table()
-            bm_face = bm.faces[face_idx]
-            # Add the rest of the edges
-            edgenet.extend(bm_face.edges)
-            bmesh.utils.face_split_edgenet(bm_face, edgenet)
+        self.hover_connector = None
+        self.hover_ring = None
 
-    def pinch_edges(self, context=None, update=False):
-        def calc_scale_factor(min_edge_len, edge_len, inside, scale_factor):
-            """ Calculates the scale factor for an edge so that the distances are all the same.
-                Bounded by the min edge length.
-
-                Args:
-                    min_edge_len: The smallest edge length that is used to do the calculations.
-                    edge_len: Length of the current edge we are calculating the scale factor for.
-                    inside: If true, use the distance from the mid point to the farthest point as the limiting factor.
-                    otherwise use the distance from the farthest point to the end point.
-                    scale_factor: The scale factor value used to compute the new scale factor value
-            """
-            length = min_edge_len
-            # Distance from the midpoint to the farthest point
-            dist_from_mid = ((length / 2 * (num_segs - 1)) / (num_segs + 1)) * scale_factor
-
-            l = edge_len
-            # Distance from the midpoint to the farthest point on the edge we are computing the scale factor for.
-            dist_from_mid2 = (l / 2 * (num_segs - 1)) / (num_segs + 1)
-
-            desired_dist = 0.0
-            if not inside:
-                # Distance from farthest point to the end point
-                dist_to_end = (length / 2 - dist_from_mid)
-
-                # Distance from the the farthest point on the edge to the end point.
-                dist_to_end2 = (l / 2) - dist_from_mid2
-
-                # The difference between the edge we are calculating for and the edge we are bound by
-                dist_difference = dist_to_end2 - dist_to_end
-
-                desired_dist = dist_from_mid2 + dist_difference
-            else:
-                desired_dist = dist_from_mid
+        for connector in self.connectors:
+            connector.clear()
+            connector.free()
 
-            return desired_dist / dist_from_mid2
+        self.connectors.clear()
 
-        bm = self.bm
-        num_segs = self.segments
+    def update_cuts(self, context, continuous=False) -> str:
+        """ Apply a change of the segments or the selection, to the mesh or to the preview.
 
-        moved = {}
-        bm.verts.ensure_lookup_table()
-        for edges in self.edges_lookup.values():
-            for i in range(0, len(edges)):
-                edge_idx = edges[i]
+            During continuous input the rebuild is deferred until the input settles, if the last one was over budget.
+        """
 
-                # Don't move vertices if they have already been moved
-                if edge_idx not in moved:
-                    verts = self.ordered_verts[edge_idx]
+        if self.preview:
+            self.update_preview()
+            return {'RUNNING_MODAL'}
 
-                    if update:
-                        for vert in verts:
-                            bm_vert = bm.verts[vert]
-                            bm_vert.co = self.orig_vert_coords[vert]
+        if continuous and self.over_budget(self.rebuild_time):
+            self.defer(context, 'CUTS')
+            return {'RUNNING_MODAL'}
 
-                    start = self.edge_vert_pair[edge_idx][0]
-                    end = self.edge_vert_pair[edge_idx][1]
+        if self.pending is not None:
+            # The rebuild also applies the deferred update
+            self.pending = 'CUTS'
+            return self.settle(context)
 
-                    scale_factor = 1
-                    if num_segs > 1:
+        return self.connect_edges(context)
 
-                        if self.pinch >= 0:
-                            scale_factor = clamp(1, 1 + (0.01 * self.pinch / ((num_segs - 1) / 2)), 1 + (
-                                (2 / (num_segs - 1))))
-                        else:
-                            scale_factor = clamp(0, 1 + (0.01 * self.pinch), 1)
+    def update_pinch(self, context, continuous=False):
+        """ Apply a change of the pinch or even setting, to the mesh or to the preview. """
 
-                        even = self.even
-                        inside = True
-                        if even != 'NO':
-                            if even == 'OUT':
-                                inside = False
-                            else:
-                                inside = True
+        if self.preview:
+            self.update_preview()
+        elif self.pending == 'CUTS' or (continuous and self.over_budget(self.pinch_time)):
+            # A deferred rebuild already applies the pinch
+            self.defer(context, 'PINCH')
+        elif self.pending is not None:
+            self.settle(context)
+        else:
+            self.pinch_edges(context, update=True)
 
-                            l = (start - end).length
-                            scale_factor = calc_scale_factor(self.min_length, l, inside, scale_factor)
+    def over_budget(self, duration):
+        return 0.0 < self.frame_budget < duration
 
-                    scale_verts_along_edge(bm, verts, start, end, scale_factor)
+    def defer(self, context, update):
+        """ Draw the preview instead of updating the meshes, until the input settles. """
 
-                moved[edge_idx] = True
+        if self.pending != 'CUTS':
+            self.pending = update
+        self.last_input = perf_counter()
+        self.update_preview()
 
-        if update:
-            assert context is not None, "Context was None when trying to update after pinching edges!"
-            mesh = context.active_object.data
-            bmesh.update_edit_mesh(mesh)
+        if self.settle_timer is None:
+            self.settle_timer = context.window_manager.event_timer_add(self.settle_delay / 2, window=context.window)
 
-        return
+    def settle(self, context) -> str:
+        """ Run the deferred update. """
 
-    def connect_edges(self, context) -> str:
-        def do_connect_edges():
-            def order_selected_edges_ccw(bm):
-                self.min_length = float('INF')
-                bm.faces.ensure_lookup_table()
-                for face_idx in self.edges_lookup.keys():
-                    ordered_edges = []
+        pending = self.pending
+        self.pending = None
+        self.preview_lines = None
+        self.dirty = True
+        self.remove_settle_timer(context)
 
-                    loop_walker = bmesh_face_loop_walker(bm.faces[face_idx])
-                    for next_loop in loop_walker:
-                        bm_edge = next_loop.edge
-                        edge_idx = bm_edge.index
+        if pending == 'CUTS':
+            return self.connect_edges(context)
 
-                        if bm_edge.index in self.tagged:
-                            ordered_edges.append(edge_idx)
+        self.pinch_edges(context, update=True)
+        return {'RUNNING_MODAL'}
 
-                            first_vert_co = next_loop.vert.co
-                            other_vert_co = bm_edge.other_vert(next_loop.vert).co
-                            self.edge_vert_pair[edge_idx] = [first_vert_co.copy(), other_vert_co.copy()]
+    def remove_settle_timer(self, context):
+        if self.settle_timer is not None:
+            context.window_manager.event_timer_remove(self.settle_timer)
+            self.settle_timer = None
 
-                            edge_len = (first_vert_co - other_vert_co).length_squared
-                            if edge_len < self.min_length:
-                                self.min_length = edge_len
+    def update_preview(self):
+        """ Compute the cuts from the original topology, without touching the meshes. """
 
-                    self.edges_lookup[face_idx] = ordered_edges
+        lines = [connector.get_preview_lines(self.get_segments(connector), self.pinch, self.even, self.slide)
+                 for connector in self.connectors]
+        self.preview_lines = np.concatenate(lines) if lines else None
+        self.dirty = True
 
-                self.min_length = self.min_length ** 0.5
+    def pinch_edges(self, context=None, update=False):
+        self.dirty = True
+        start = perf_counter()
+        for connector in self.connectors:
+            if self.slide:
+                # Sliding also applies the pinch
+                connector.slide_edges(self.get_segments(connector), self.pinch, self.even, self.slide, update=update)
+            else:
+                connector.pinch_edges(self.get_segments(connector), self.pinch, self.even, update=update)
+        self.pinch_time = perf_counter() - start
 
-            # Restore the initial state of the mesh data
-            mesh = context.active_object.data
+    def connect_edges(self, context) -> str:
+        def do_connect_edges():
+            # Restore the initial state of the mesh data of every object with a single mode switch
             bpy.ops.object.mode_set(mode='OBJECT')
-            self.initial_bm.to_mesh(mesh)
+            for connector in self.connectors:
+                connector.restore()
             bpy.ops.object.mode_set(mode='EDIT')
 
-            self.bm = bmesh.from_edit_mesh(mesh)
-            
-            bm = self.bm
-            self.clear()
-            selected_edges = self.selected_edges
-            bm.select_mode = {'EDGE'}
-
-            bm.edges.ensure_lookup_table()
-            if len(selected_edges) > 1:
-                for edge_idx in selected_edges:
-                    bm_edge = bm.edges[edge_idx]
-
-                    for bm_face in bm_edge.link_faces:
-                        if bm_face.index not in self.edges_lookup:
-                            self.edges_lookup[bm_face.index] = [bm_edge.index]
-                        else:
-                            self.edges_lookup[bm_face.index].append(bm_edge.index)
-
-                    bm_edge.select= True
-                    #self.bm.select_flush_mode()
-                    self.tagged.add(bm_edge.index)
-
-                # Filter out faces with only one selected edge
-                self.edges_lookup = {face: edges for (face, edges) in self.edges_lookup.items() if len(edges) > 1}
-            elif len(selected_edges) == 1:
-                # Select the only edge
-                bm.edges[selected_edges.pop()].select = True
-                
-
-            order_selected_edges_ccw(bm)
-
-            self.create_geometry()
-
-            self.pinch_edges()
-            # self.bm.verts.index_update()
-            # self.bm.edges.index_update()
-            # self.bm.faces.index_update()
-            # for edge in self.bm.edges:
-            #     if edge.select:
-            #         print("Selected: {}".format(edge.index))
-            self.bm.select_flush_mode()
-            bmesh.update_edit_mesh(mesh, destructive=True)
-
+            for connector in self.connectors:
+                connector.build(self.get_segments(connector), self.pinch, self.even, self.slide)
 
         try:
+            self.dirty = True
+            start = perf_counter()
             do_connect_edges()
+            self.rebuild_time = perf_counter() - start
         except BaseException:
             self.report({'ERROR'}, "Something went wrong. See console for more info.")
             print_exc()
@@ -0,0 +1,1312 @@
+from typing import *
+from collections import defaultdict
+
+import bpy
+import bmesh
+import numpy as np
+from bmesh.types import *
+from mathutils import Vector
+from mathutils.geometry import intersect_line_line
+from mathutils.bvhtree import BVHTree
+
+from .cuts import (get_scale_factors,
+                   get_cut_params,
+                   get_cut_positions,
+                   get_cut_lines,
+                   get_slide_signs,
+                   get_slide_params,
+                   get_edge_params,
+                   find_corners,
+                   interpolate_rows,
+                   interpolate_entries,
+                   get_edge_keys,
+                   find_edges,
+                   get_point_grid,
+                   find_mirror_points,
+                   get_edge_groups,
+                   get_group_min_lengths,
+                   get_spacing_segments,
+                   get_strip_segments)
+from .utils import (bmesh_face_loop_walker,
+                    bmesh_edge_ring_walker,
+                    bmesh_subdivide_edge,
+                    scale_verts_along_edge,
+                    ensure,
+                    get_nearest_edge,
+                    get_perc_along,
+                    get_edge_coords,
+                    get_bounds_corners,
+                    project_to_region,
+                    ScreenEdgeIndex,
+                    points_in_box,
+                    points_in_polygon,
+                    get_attribute_layers,
+                    get_layer_values,
+                    set_layer_values,
+                    get_shape_key_coords,
+                    set_shape_key_coords,
+                    get_corner_normals,
+                    get_corner_topology)
+
+
+# Largest distance between a vertex and the mirror of its counterpart on the other side of the X axis
+MIRROR_DISTANCE = 0.0001
+
+# Temporary face layer holding the index + 1 of the face each face was split from, during a ring subdivision
+ORIGIN_LAYER = "connect_edges_origin"
+
+
+class EdgeConnector(object):
+    """ Per-object state of a connect edges session.
+
+        Holds the unmodified bmesh of one edit mode object together with the selection and the
+        data needed to rebuild and pinch the new edges of that object.
+    """
+
+    def __init__(self, obj, users=None):
+        # The first user of the mesh
+        self.obj = obj
+        # All objects sharing the mesh of obj. They get the result through the shared data, and are picked and
+        # drawn each with its own matrix.
+        self.users = users if users is not None else [obj] if obj is not None else []
+
+        # Unmodifed bmesh data used to initialize
+        self.initial_bm = None
+        # Bmesh to modify
+        self.bm = None
+
+        # Map each face to its selected edges
+        # Once these edges are sub'd the indices are no longer considered valid
+        self.edges_lookup: Dict[int, List[int]] = {}
+
+        # Map a selected edge to it's start and end vertex coordinates
+        self.edge_vert_pair = {}
+
+        # Ordered edges->List of vertices in ccw order
+        self.ordered_verts: DefaultDict[int, List[int]] = defaultdict(list)
+
+        # Original coordinates of a vertex
+        self.orig_vert_coords = {}
+
+        self.min_length = float('INF')
+
+        # The edges of edge_vert_pair and their start and end coordinates as arrays
+        self.cut_edges = np.empty(0, dtype=np.int64)
+        self.cut_starts = np.empty((0, 3))
+        self.cut_ends = np.empty((0, 3))
+        # Start and end vertex of each cut edge
+        self.cut_verts = np.empty((0, 2), dtype=np.int64)
+        # Every face to cut is a quad cut across by two opposite edges, so the cuts are whole rings or strips
+        # that bmesh.ops.subdivide_edges can make natively
+        self.ring_selection = False
+        # Consecutive selected edges of each face as rows into the arrays above, see cuts.get_cut_lines
+        self.cut_pairs = np.empty((0, 4), dtype=np.int64)
+        # Slide direction of each cut edge, see cuts.get_slide_signs
+        self.slide_signs = np.empty(0, dtype=np.int64)
+        # Number of segments of each edge of the initial mesh, from an edge attribute. None if not used.
+        self.edge_segments = None
+
+        # Ring or strip of each cut edge and the smallest edge length of that ring, see cuts.get_edge_groups
+        self.cut_groups = np.empty(0, dtype=np.int64)
+        self.ring_min_lengths = np.empty(0)
+
+        # The new vertices of the last rebuild, and the row and column of each in the cut arrays.
+        # Collected on the first slide after a rebuild.
+        self.slide_verts = None
+        self.slide_rows = None
+        self.slide_cols = None
+
+        # Each face created by the last rebuild and the face it was split from
+        self.face_origins = np.empty((0, 2), dtype=np.int64)
+
+        # Corner attributes of the initial mesh with its corner faces and vertices, to interpolate the new corners from
+        self.source_corners = None
+        self.source_corner_faces = None
+        self.source_corner_verts = None
+        self.source_num_verts = 0
+        # Corner normals of the initial mesh if it has custom normals
+        self.source_normals = None
+
+        # Store the selected edges
+        self.selected_edges = set()
+        # The edges that are cut: the selected edges and their mirror with X-mirror
+        self.cut_selection = set()
+        # The selected edges at setup, and the selected edges of the edit mesh while only previewing,
+        # when no rebuild writes the selection
+        self.initial_selection = frozenset()
+        self.edit_selection = set()
+
+        # Mirror the selection across the local X axis
+        self.use_mirror_x = False
+        # Vertex coordinates, edge lookup and point grid of the initial mesh, built once per session.
+        # mirror_verts caches the mirror of each vertex, -2 until it is looked up and -1 if it has none.
+        self.mirror_coords = None
+        self.mirror_edge_verts = None
+        self.mirror_edge_keys = None
+        self.mirror_grid = None
+        self.mirror_verts = None
+        # Edges ignored when selected
+        self.ignore_edges = set()
+
+        self.tagged = set()
+
+        # Maps the currently selected edge to the original edge before it was subdivided
+        self.selected_edge_lookup = {}
+
+        # BVH tree of the visible faces of the initial bmesh used to pick edges. Built on the first pick.
+        self.bvh = None
+        # Face index in the initial bmesh of each polygon in the tree
+        self.bvh_faces = None
+
+        # Vertex coordinates and midpoints of the visible edges of the initial mesh and their indices,
+        # for box and lasso selection and for hovering
+        self.edge_coords = None
+        self.edge_midpoints = None
+        self.visible_edges = None
+        # Corners of the bounding box of the visible edges
+        self.edge_bounds = None
+
+        # Region space grid of the visible edges of each user by index in users, built when the mouse gets near
+        # the user and dropped when the view changes
+        self.screen_indices: Dict[int, ScreenEdgeIndex] = {}
+        self.screen_view_key = None
+
+        # Maps an edge to the ring it belongs to, filled as rings are walked
+        self.ring_lookup: Dict[int, FrozenSet[int]] = {}
+
+    @property
+    def mesh(self):
+        return self.obj.data
+
+    def setup(self):
+        """ Copy the edit mesh and move its edge selection into selected_edges. """
+
+        mesh = self.mesh
+        self.obj.update_from_editmode()
+        self.initial_bm = bmesh.new()
+        self.initial_bm.from_mesh(mesh)
+        self.read_attributes(mesh)
+
+        hidden = np.empty(len(mesh.edges), dtype=bool)
+        mesh.edges.foreach_get("hide", hidden)
+        self.visible_edges = np.flatnonzero(~hidden)
+        self.edge_coords = get_edge_coords(mesh)[self.visible_edges]
+        self.edge_midpoints = self.edge_coords.mean(axis=1)
+        self.edge_bounds = get_bounds_corners(self.edge_coords.reshape(-1, 3))
+
+        self.use_mirror_x = mesh.use_mirror_x
+        if self.use_mirror_x:
+            self.setup_mirror(mesh)
+
+        self.selected_edges.clear()
+        self.initial_bm.select_mode = {'EDGE'}
+        ensure(self.initial_bm)
+        for bm_edge in self.initial_bm.edges:
+            if bm_edge.select:
+                self.selected_edges.add(bm_edge.index)
+                bm_edge.select_set(False)
+
+        self.initial_bm.select_flush_mode()
+        self.initial_selection = frozenset(self.selected_edges)
+        self.edit_selection = set(self.selected_edges)
+
+    def setup_mirror(self, mesh):
+        """ Build the point grid and edge lookup used to mirror the selection. """
+
+        coords = np.empty(len(mesh.vertices) * 3)
+        mesh.vertices.foreach_get("co", coords)
+        self.mirror_coords = coords.reshape(-1, 3)
+
+        edge_verts = np.empty(len(mesh.edges) * 2, dtype=np.int64)
+        mesh.edges.foreach_get("vertices", edge_verts)
+        self.mirror_edge_verts = edge_verts.reshape(-1, 2)
+        self.mirror_edge_keys = get_edge_keys(self.mirror_edge_verts, len(self.mirror_coords))
+
+        self.mirror_grid = get_point_grid(self.mirror_coords, MIRROR_DISTANCE)
+
+        self.mirror_verts = np.full(len(self.mirror_coords), -2, dtype=np.int64)
+
+    def get_mirror_verts(self, verts):
+        """ Vertex on the other side of the X axis of each vertex, -1 where there is none. """
+
+        unknown = np.unique(verts[self.mirror_verts[verts] == -2])
+        self.mirror_verts[unknown] = find_mirror_points(self.mirror_grid, self.mirror_coords, unknown, MIRROR_DISTANCE)
+
+        return self.mirror_verts[verts]
+
+    def get_mirror_edges(self, edges):
+        """ Edge on the other side of the X axis of each edge, -1 where there is none. """
+
+        edges = np.asarray(edges, dtype=np.int64)
+        mirror_verts = self.get_mirror_verts(self.mirror_edge_verts[edges].ravel()).reshape(-1, 2)
+        return find_edges(self.mirror_edge_keys, len(self.mirror_coords), mirror_verts[:, 0], mirror_verts[:, 1])
+
+    def prepare(self):
+        """ Map each face to its selected edges in ccw order.
+
+            Only reads the initial bmesh, which has the same indices as the restored edit mesh,
+            so the result stays valid until the selection changes.
+        """
+
+        bm = self.initial_bm
+        selected_edges = self.selected_edges
+        mirror_edges = np.empty(0, dtype=np.int64)
+        if self.use_mirror_x and selected_edges:
+            selected = np.fromiter(selected_edges, dtype=np.int64, count=len(selected_edges))
+            mirror_edges = self.get_mirror_edges(selected)
+            selected_edges = selected_edges | set(mirror_edges[mirror_edges >= 0].tolist())
+            mirror_edges = np.stack((selected, mirror_edges), axis=1)
+
+        self.cut_selection = selected_edges
+
+        edges_lookup = {}
+        edge_vert_pair = {}
+        min_length = float('INF')
+        ring_selection = True
+
+        # The vertex each face walks a selected edge from, and the one edge_vert_pair starts at
+        face_edge_starts = {}
+        edge_starts = {}
+        edge_ends = {}
+
+        if len(selected_edges) > 1:
+            face_counts = defaultdict(int)
+            for edge_idx in selected_edges:
+                for bm_face in bm.edges[edge_idx].link_faces:
+                    face_counts[bm_face.index] += 1
+
+            for face_idx, count in face_counts.items():
+                # Filter out faces with only one selected edge
+                if count < 2:
+                    continue
+
+                ordered_edges = []
+                starts = []
+                for loop in bm.faces[face_idx].loops:
+                    bm_edge = loop.edge
+                    edge_idx = bm_edge.index
+
+                    if edge_idx in selected_edges:
+                        ordered_edges.append(edge_idx)
+                        starts.append(loop.vert.index)
+                        edge_starts[edge_idx] = loop.vert.index
+                        edge_ends[edge_idx] = bm_edge.other_vert(loop.vert).index
+
+                        first_vert_co = loop.vert.co
+                        other_vert_co = bm_edge.other_vert(loop.vert).co
+                        edge_vert_pair[edge_idx] = [first_vert_co.copy(), other_vert_co.copy()]
+
+                        edge_len = (first_vert_co - other_vert_co).length_squared
+                        if edge_len < min_length:
+                            min_length = edge_len
+
+                edges_lookup[face_idx] = ordered_edges
+                face_edge_starts[face_idx] = starts
+
+                if ring_selection and (count != 2 or len(bm.faces[face_idx].verts) != 4 or
+                                       set(bm.edges[ordered_edges[0]].verts) & set(bm.edges[ordered_edges[1]].verts)):
+                    ring_selection = False
+
+        self.edges_lookup = edges_lookup
+        self.ring_selection = ring_selection and bool(edges_lookup)
+        self.edge_vert_pair = edge_vert_pair
+        self.min_length = min_length ** 0.5
+
+        rows = {edge_idx: row for row, edge_idx in enumerate(edge_vert_pair)}
+        pairs = []
+        for face_idx, edges in edges_lookup.items():
+            starts = face_edge_starts[face_idx]
+            for i in range(len(edges)):
+                a = i
+                b = (i + 1) % len(edges)
+                pairs.append((rows[edges[a]], rows[edges[b]],
+                              starts[a] != edge_starts[edges[a]], starts[b] != edge_starts[edges[b]]))
+
+        self.cut_edges = np.array(list(edge_vert_pair), dtype=np.int64)
+        self.cut_starts = np.array([pair[0] for pair in edge_vert_pair.values()]).reshape(-1, 3)
+        self.cut_ends = np.array([pair[1] for pair in edge_vert_pair.values()]).reshape(-1, 3)
+        self.cut_verts = np.array([(edge_starts[edge_idx], edge_ends[edge_idx]) for edge_idx in edge_vert_pair],
+                                  dtype=np.int64).reshape(-1, 2)
+        self.cut_pairs = np.array(pairs, dtype=np.int64).reshape(-1, 4)
+        self.slide_signs = get_slide_signs(len(self.cut_edges), np.concatenate((self.cut_pairs,
+                                                                                self.get_mirror_pairs(rows, mirror_edges))))
+        self.cut_groups = get_edge_groups(len(self.cut_edges), self.cut_pairs)
+        self.ring_min_lengths = get_group_min_lengths(np.linalg.norm(self.cut_ends - self.cut_starts, axis=1),
+                                                      self.cut_groups)
+
+    def get_mirror_pairs(self, rows, mirror_edges):
+        """ Rows for cuts.get_slide_signs that make each cut edge slide like its mirror, seen from the other side.
+
+            Args:
+                rows: Maps a cut edge to its row in the cut arrays.
+                mirror_edges: (k, 2) array of selected edges and their mirror edge, -1 for none.
+        """
+
+        pairs = [(rows[edge_idx], rows[mirror_idx], 0, 0) for edge_idx, mirror_idx in mirror_edges.tolist()
+                 if edge_idx != mirror_idx and edge_idx in rows and mirror_idx in rows]
+        pairs = np.array(pairs, dtype=np.int64).reshape(-1, 4)
+        if len(pairs) == 0:
+            return pairs
+
+        # Same flags make the pair slide in opposite directions. Flag the pairs whose starts mirror each other.
+        starts = self.cut_verts[pairs[:, 0], 0]
+        mirror_starts = self.cut_verts[pairs[:, 1], 0]
+        pairs[:, 3] = self.get_mirror_verts(starts) == mirror_starts
+        return pairs
+
+    def get_segment_counts(self, num_segs):
+        """ Number of segments of each edge in cut_edges.
+
+            num_segs is a number of segments for all the edges, or an array with the number of each edge,
+            as returned by get_spacing_segments. The methods taking num_segs accept both.
+        """
+        return np.broadcast_to(np.asarray(num_segs, dtype=np.int64), self.cut_edges.shape)
+
+    def get_spacing_segments(self, spacing):
+        """ Number of segments of each edge in cut_edges for new vertices spaced about spacing apart in world space.
+
+            The mesh is shared, so the distance is measured on the first user.
+        """
+
+        directions = self.cut_ends - self.cut_starts
+        if self.obj is not None:
+            directions = directions @ np.array(self.obj.matrix_world)[:3, :3].T
+        return get_spacing_segments(np.linalg.norm(directions, axis=1), self.cut_groups, spacing)
+
+    def get_strip_segments(self, edge_segments, default):
+        """ Number of segments of each edge in cut_edges from a count per edge of the initial mesh.
+
+            Each strip uses the largest count of its edges, strips without counts use default.
+        """
+        return get_strip_segments(np.asarray(edge_segments)[self.cut_edges], self.cut_groups, default)
+
+    def get_scale_factors(self, num_segs, pinch, even):
+        """ Scale factor of each edge in cut_edges. """
+        lengths = np.linalg.norm(self.cut_ends - self.cut_starts, axis=1)
+        min_length = self.ring_min_lengths if even in ('RING_IN', 'RING_OUT') else self.min_length
+        return get_scale_factors(lengths, num_segs, pinch, even, min_length)
+
+    def get_cut_params(self, num_segs, pinch, even, slide=0.0):
+        """ Parameters of the new vertices along each edge in cut_edges. """
+        params = get_cut_params(num_segs, self.get_scale_factors(num_segs, pinch, even))
+        return get_slide_params(params, self.slide_signs, slide)
+
+    def get_preview_lines(self, num_segs, pinch, even, slide=0.0):
+        """ World space end points of the edges a rebuild would create on every user, two per edge.
+            Doesn't touch the mesh.
+        """
+
+        params = self.get_cut_params(num_segs, pinch, even, slide)
+        lines = get_cut_lines(get_cut_positions(self.cut_starts, self.cut_ends, params), self.cut_pairs,
+                              self.get_segment_counts(num_segs))
+
+        matrices = [np.array(user.matrix_world) for user in self.users]
+        return np.concatenate([lines @ matrix[:3, :3].T + matrix[:3, 3] for matrix in matrices])
+
+    def scan_selection(self):
+        """ Find the edges that were selected or deselected in the edit mesh since the last rebuild. """
+
+        bm = bmesh.from_edit_mesh(self.mesh)
+
+        selected = set()
+        deselected = set()
+
+        # Loop through all edges and get the recently selected or deselected edges
+        for bm_edge in bm.edges:
+            edge_idx = bm_edge.index
+            if bm_edge.select and edge_idx not in self.tagged and edge_idx not in self.ignore_edges:
+                selected.add(edge_idx)
+
+            if not bm_edge.select and edge_idx in self.tagged and edge_idx not in self.ignore_edges:
+                deselected_edge_idx = None
+
+                # Check to see if the deselected edge was once created by subdividing an edge
+                if edge_idx in self.selected_edge_lookup:
+                    deselected_edge_idx = self.selected_edge_lookup[edge_idx]
+                else:
+                    deselected_edge_idx = edge_idx
+
+                deselected.add(deselected_edge_idx)
+
+        return selected, deselected
+
+    def write_selection(self):
+        """ Make the edge selection of the edit mesh match selected_edges, when no rebuild writes it.
+
+            Only the edges whose state changed since the last write are touched.
+        """
+
+        selected_edges = self.selected_edges
+        previous = self.edit_selection
+        if selected_edges == previous:
+            return
+
+        bm = bmesh.from_edit_mesh(self.mesh)
+        bm.edges.ensure_lookup_table()
+        # Deselect first, so that the vertices shared with selected edges end up selected
+        for edge_idx in previous - selected_edges:
+            bm.edges[edge_idx].select_set(False)
+        for edge_idx in selected_edges - previous:
+            bm.edges[edge_idx].select_set(True)
+
+        bm.select_flush_mode()
+        bmesh.update_edit_mesh(self.mesh, loop_triangles=False, destructive=False)
+        self.edit_selection = set(selected_edges)
+
+    def ray_cast(self, origin, direction):
+        """ Find the edge under a ray given in world space.
+
+            Picks against the visible faces of the initial bmesh, so hidden faces never block the ray.
+            The selection is made of its edges, and cutting or pinching never moves the surface, so the
+            tree is built once per session. Every user of the mesh is hit with its own matrix.
+
+            Returns:
+                The distance to the hit and the index of the closest edge of the hit face, or None.
+        """
+
+        if self.bvh is None:
+            self.build_bvh()
+
+        best = None
+        for user in self.users:
+            matrix = user.matrix_world
+            matrix_inv = matrix.inverted()
+
+            location, _, poly_idx, _ = self.bvh.ray_cast(matrix_inv @ origin, matrix_inv.to_3x3() @ direction)
+            if location is None:
+                continue
+
+            dist = (matrix @ location - origin).length
+            if best is None or dist < best[0]:
+                bm_face = self.initial_bm.faces[self.bvh_faces[poly_idx]]
+                best = dist, get_nearest_edge(bm_face, location).index
+
+        return best
+
+    def build_bvh(self):
+        """ Build the picking tree from the visible faces of the initial bmesh. """
+
+        bm = self.initial_bm
+        faces = [face for face in bm.faces if not face.hide]
+        self.bvh = BVHTree.FromPolygons([vert.co for vert in bm.verts],
+                                        [[vert.index for vert in face.verts] for face in faces])
+        self.bvh_faces = [face.index for face in faces]
+
+    def edges_in_region(self, region, rv3d, box=None, polygon=None, xray=False):
+        """ Find the visible edges whose midpoint is inside a rectangle or a polygon in region space, on any user.
+
+            All midpoints of a user are projected with one matrix multiply and tested together.
+
+            Args:
+                box: Two opposite corners of the rectangle.
+                polygon: The points of the polygon.
+                xray: Keep the edges behind the surface, like selecting with X-ray on.
+
+            Returns:
+                A set of edge indices.
+        """
+
+        edges = set()
+        for user in self.users:
+            matrix = user.matrix_world
+            points, depths = project_to_region(region, rv3d, matrix, self.edge_midpoints)
+            in_front = depths > 0.0
+
+            if box is not None:
+                inside = points_in_box(points, np.array(box[0]), np.array(box[1]))
+            else:
+                inside = points_in_polygon(points, polygon)
+
+            hits = np.flatnonzero(inside & in_front)
+            if not xray:
+                hits = hits[~self.get_occluded(rv3d, matrix, self.edge_midpoints[hits])]
+
+            edges.update(self.visible_edges[hits].tolist())
+
+        return edges
+
+    def get_occluded(self, rv3d, matrix, coords):
+        """ Find the local coordinates of a user hidden from the view by the visible faces of that user.
+
+            Each coordinate is ray cast from the view, and counts as hidden when a face is hit clearly before it.
+
+            Args:
+                matrix: World matrix of the user.
+
+            Returns:
+                A boolean array, True where the coordinate is hidden.
+        """
+
+        occluded = np.zeros(len(coords), dtype=bool)
+        if not len(coords):
+            return occluded
+
+        if self.bvh is None:
+            self.build_bvh()
+
+        matrix_inv = matrix.inverted()
+        view_matrix = rv3d.view_matrix.inverted()
+
+        if rv3d.is_perspective:
+            origins = np.broadcast_to(np.array(matrix_inv @ view_matrix.translation), coords.shape)
+        else:
+            # Parallel rays, starting outside of the mesh
+            view_dir = np.array((matrix_inv.to_3x3() @ view_matrix.to_3x3() @ Vector((0.0, 0.0, -1.0))).normalized())
+            origins = coords - view_dir * (np.linalg.norm(np.ptp(self.edge_coords.reshape(-1, 3), axis=0)) + 1.0)
+
+        directions = coords - origins
+        distances = np.linalg.norm(directions, axis=1)
+
+        ray_cast = self.bvh.ray_cast
+        for i, (origin, direction, distance) in enumerate(zip(origins.tolist(), directions.tolist(), distances.tolist())):
+            if distance == 0.0:
+                continue
+
+            # The faces around the edge are hit at the distance of the edge itself
+            occluded[i] = ray_cast(origin, direction, distance * (1.0 - 1e-4))[0] is not None
+
+        return occluded
+
+    def is_hidden(self, origin, point):
+        """ Whether a visible face of any user is hit clearly before a point, by a ray from origin. Both in world space. """
+
+        if self.bvh is None:
+            self.build_bvh()
+
+        for user in self.users:
+            matrix_inv = user.matrix_world.inverted()
+            local_origin = matrix_inv @ origin
+            direction = matrix_inv @ point - local_origin
+
+            distance = direction.length
+            if distance > 0.0 and self.bvh.ray_cast(local_origin, direction, distance * (1.0 - 1e-4))[0] is not None:
+                return True
+
+        return False
+
+    def pick(self, region, rv3d, coord, origin, direction, radius=10.0):
+        """ Find the edge under a region coordinate, for hovering and clicking alike.
+
+            That is the edge closest to the coordinate on screen, unless a face hides it. Otherwise it is the
+            closest edge of the face under the coordinate, see ray_cast.
+
+            Args:
+                origin: World space origin of the view ray through coord.
+                direction: World space direction of the view ray through coord.
+
+            Returns:
+                The world space distance from origin to the edge and the index of the edge, or None.
+        """
+
+        hit = self.hover(region, rv3d, coord, radius)
+        if hit is not None:
+            _, edge_idx, user = hit
+            point = user.matrix_world @ self.get_closest_point(user.matrix_world, edge_idx, origin, direction)
+            if not self.is_hidden(origin, point):
+                return (point - origin).length, edge_idx
+
+        return self.ray_cast(origin, direction)
+
+    def get_closest_point(self, matrix, edge_idx, origin, direction):
+        """ The local point of a visible edge closest to a world space ray, for the user with the matrix. """
+
+        matrix_inv = matrix.inverted()
+        origin = matrix_inv @ origin
+        direction = matrix_inv.to_3x3() @ direction
+
+        start, end = (Vector(co) for co in self.edge_coords[np.searchsorted(self.visible_edges, edge_idx)])
+        vec = end - start
+        closest = intersect_line_line(start, end, origin, origin + direction)
+        if closest is None or vec.length_squared == 0.0:
+            # Parallel to the ray
+            return start
+
+        t = min(max((closest[0] - start).dot(vec) / vec.length_squared, 0.0), 1.0)
+        return start + vec * t
+
+    def hover(self, region, rv3d, coord, radius=10.0):
+        """ Find the edge closest to a region coordinate with the screen indices, behind a face or not.
+
+            Only the users whose bounds are near the coordinate get a screen index.
+
+            Returns:
+                The depth and the index of the edge and the user it was found on, or None.
+        """
+
+        view_key = (tuple(map(tuple, rv3d.perspective_matrix)), region.width, region.height)
+        if view_key != self.screen_view_key:
+            self.screen_indices.clear()
+            self.screen_view_key = view_key
+
+        best = None
+        for i, user in enumerate(self.users):
+            matrix = user.matrix_world
+
+            points, depths = project_to_region(region, rv3d, matrix, self.edge_bounds)
+            # Bounds partly behind the view can't be tested on screen
+            if np.all(depths > 0.0) and not points_in_box(np.array([coord]), points.min(axis=0) - radius,
+                                                          points.max(axis=0) + radius)[0]:
+                continue
+
+            screen_index = self.screen_indices.get(i)
+            if screen_index is None:
+                screen_index = self.screen_indices[i] = ScreenEdgeIndex()
+                points, depths = project_to_region(region, rv3d, matrix, self.edge_coords.reshape(-1, 3))
+                screen_index.build(self.visible_edges, points.reshape(-1, 2, 2), depths.reshape(-1, 2), view_key)
+
+            hit = screen_index.nearest(coord[0], coord[1], radius)
+            if hit is not None and (best is None or hit[0] < best[0]):
+                best = hit + (user,)
+
+        return best
+
+    def region_lines(self, region, rv3d, edges):
+        """ Region coordinates of the vertices of some edges on every user, two per edge, for drawing them. """
+
+        edges = np.fromiter(edges, dtype=np.int64)
+        pos = np.searchsorted(self.visible_edges, edges)
+        # Hidden edges are not in the visible edges
+        pos = pos[self.visible_edges[np.minimum(pos, len(self.visible_edges) - 1)] == edges]
+        coords = self.edge_coords[pos].reshape(-1, 3)
+
+        lines = []
+        for user in self.users:
+            points, depths = project_to_region(region, rv3d, user.matrix_world, coords)
+            in_front = np.all(depths.reshape(-1, 2) > 0.0, axis=1)
+            lines.append(points.reshape(-1, 2, 2)[in_front].reshape(-1, 2))
+
+        return np.concatenate(lines) if lines else np.empty((0, 2), dtype=np.float32)
+
+    def get_ring(self, edge_idx):
+        """ Indices of the edges in the ring of an edge of the initial bmesh. """
+
+        ring = self.ring_lookup.get(edge_idx)
+        if ring is None:
+            bm_edge = self.initial_bm.edges[edge_idx]
+
+            # Wire edges have no ring
+            if not bm_edge.link_loops:
+                ring = frozenset((edge_idx,))
+            else:
+                ring = frozenset(loop.edge.index for loop in bmesh_edge_ring_walker(bm_edge))
+
+            # Every edge of the ring has the same ring
+            for ring_edge_idx in ring:
+                self.ring_lookup[ring_edge_idx] = ring
+
+        return ring
+
+    def restore(self):
+        """ Write the initial state back to the mesh. Must be called in object mode. """
+        self.initial_bm.to_mesh(self.mesh)
+
+    def build(self, num_segs, pinch, even, slide=0.0):
+        """ Rebuild the new edges on the restored edit mesh. """
+
+        mesh = self.mesh
+        self.connect(bmesh.from_edit_mesh(mesh), num_segs, pinch, even, slide)
+        bmesh.update_edit_mesh(mesh, destructive=True)
+
+    def connect(self, bm, num_segs, pinch, even, slide=0.0, select=True):
+        """ Subdivide and connect the selected edges of bm, which must have the topology of the initial bmesh.
+
+            With select off, the select mode and the selection of bm are left alone.
+        """
+
+        self.bm = bm
+        self.clear()
+        selected_edges = self.cut_selection
+        if select:
+            bm.select_mode = {'EDGE'}
+
+        bm.edges.ensure_lookup_table()
+        if len(selected_edges) > 1:
+            for edge_idx in selected_edges:
+                if select:
+                    bm.edges[edge_idx].select = True
+                self.tagged.add(edge_idx)
+
+        elif len(selected_edges) == 1 and select:
+            # Select the only edge
+            bm.edges[next(iter(selected_edges))].select = True
+
+        if self.ring_selection:
+            self.create_ring_geometry(num_segs, select)
+        else:
+            self.create_geometry(num_segs, select)
+
+        if slide:
+            self.slide_edges(num_segs, pinch, even, slide)
+        else:
+            self.pinch_edges(num_segs, pinch, even)
+
+        if select:
+            bm.select_flush_mode()
+
+    def clear(self):
+        """ Clear the data created by the last rebuild. """
+
+        self.ordered_verts.clear()
+        self.ignore_edges.clear()
+        self.selected_edge_lookup.clear()
+
+        self.tagged.clear()
+        self.orig_vert_coords.clear()
+
+        self.slide_verts = None
+        self.slide_rows = None
+        self.slide_cols = None
+
+        self.face_origins = np.empty((0, 2), dtype=np.int64)
+
+    def free(self):
+        self.bvh = None
+        self.bvh_faces = None
+        self.edge_coords = None
+        self.edge_midpoints = None
+        self.visible_edges = None
+        self.edge_segments = None
+        self.edge_bounds = None
+        self.screen_indices.clear()
+        self.screen_view_key = None
+        self.ring_lookup.clear()
+
+        self.mirror_coords = None
+        self.mirror_edge_verts = None
+        self.mirror_edge_keys = None
+        self.mirror_grid = None
+        self.mirror_verts = None
+
+        self.source_corners = None
+        self.source_corner_faces = None
+        self.source_corner_verts = None
+        self.source_normals = None
+
+        if self.bm is not None:
+            self.bm.free()
+            self.bm = None
+
+        if self.initial_bm is not None:
+            self.initial_bm.free()
+            self.initial_bm = None
+
+    def create_geometry(self, num_segs, select=True):
+        def order_verts_on_edge(start_co, end_co, verts):
+            bm.verts.ensure_lookup_table()
+            verts.sort(key=lambda x: get_perc_along(start_co, end_co, bm.verts[x].co))
+
+        bm = self.bm
+        segments = dict(zip(self.cut_edges.tolist(), self.get_segment_counts(num_segs).tolist()))
+
+        split_faces = []
+        subdivided_edges = set()
+        for face_idx, edges in self.edges_lookup.items():
+            bm.faces.ensure_lookup_table()
+            for next_loop in bmesh_face_loop_walker(bm.faces[face_idx]):
+                next_edge = next_loop.edge
+                bm.edges.ensure_lookup_table()
+                next_edge_idx = next_edge.index
+
+                start = next_loop.vert
+                end = next_loop.edge.other_vert(next_loop.vert)
+
+                # Subdivide the edge if it was selected and hasn't been subdivided yet
+                if next_edge_idx not in subdivided_edges and next_edge_idx in self.cut_selection:
+                    ret = bmesh_subdivide_edge(bm, bm.edges[next_edge_idx], segments[next_edge_idx])
+
+                    bm.edges.index_update()
+                    new_verts = []
+                    for bm_element in ret:
+                        if isinstance(bm_element, BMVert):
+                            new_verts.append(bm_element.index)
+                            self.orig_vert_coords[bm_element.index] = bm_element.co.copy()
+
+                        elif isinstance(bm_element, BMEdge):
+                            self.tagged.add(bm_element.index)
+                            self.selected_edge_lookup[bm_element.index] = next_edge_idx
+                            if select:
+                                bm_element.select = True
+                            #self.bm.select_flush_mode()
+
+                    order_verts_on_edge(start.co, end.co, new_verts)
+
+                    # The edge was sudivivded. Add it to the set.
+                    subdivided_edges.add(next_edge_idx)
+                    self.ordered_verts[next_edge_idx] = new_verts
+
+                # The edge has already been subdivided.
+                # We still need to order the vertices in the ccw direction for the current face
+                elif next_edge_idx in self.cut_selection:
+                    order_verts_on_edge(start.co, end.co, self.ordered_verts[next_edge_idx])
+
+            edgenet = []
+            connected_vert_pairs = set()
+            for i in range(0, len(edges)):
+                # List of indices from vertices that were created from subdividing the edge
+                edge_a = self.ordered_verts[edges[i]]
+                edge_b = self.ordered_verts[edges[(i + 1) % len(edges)]]
+
+                # Both edges are in the same strip and have the same number of segments
+                edge_segs = segments[edges[i]]
+                n = int(edge_segs / 2) + (edge_segs % 2)
+                for j in range(0, n):
+                    vert1_idx = edge_b[j]
+                    vert2_idx = edge_a[-(j + 1)]
+
+                    # Make sure to only create one edge per vertex pair
+                    vert_pair = frozenset([vert1_idx, vert2_idx])
+                    if vert_pair not in connected_vert_pairs:
+                        bm.verts.ensure_lookup_table()
+                        bm_vert_a = bm.verts[edge_b[j]]
+                        bm_vert_b = bm.verts[edge_a[-(j + 1)]]
+
+                        bm_edge = bm.edges.new([bm_vert_a, bm_vert_b])
+
+                        bm.edges.index_update()
+                        edgenet.append(bm_edge)
+                        connected_vert_pairs.add(vert_pair)
+
+                        self.tagged.add(bm_edge.index)
+                        self.ignore_edges.add(bm_edge.index)
+
+            bm.faces.ensure_lookup_table()
+            bm_face = bm.faces[face_idx]
+            # Add the rest of the edges
+            edgenet.extend(bm_face.edges)
+            new_faces = bmesh.utils.face_split_edgenet(bm_face, edgenet)
+
+            split_faces.append((bm_face, face_idx))
+            split_faces.extend((new_face, face_idx) for new_face in new_faces if new_face != bm_face)
+
+        # The other faces of the subdivided edges got new corners without being split. They keep their index.
+        seen = {bm_face for bm_face, _ in split_faces}
+        bm.edges.ensure_lookup_table()
+        for edge_idx in subdivided_edges:
+            for bm_face in bm.edges[edge_idx].link_faces:
+                if bm_face not in seen:
+                    seen.add(bm_face)
+                    split_faces.append((bm_face, None))
+
+        bm.faces.index_update()
+        self.face_origins = np.array([(bm_face.index, bm_face.index if face_idx is None else face_idx)
+                                      for bm_face, face_idx in split_faces], dtype=np.int64).reshape(-1, 2)
+
+    def create_ring_geometry(self, num_segs, select=True):
+        """ Same result as create_geometry for ring selections, made by bmesh.ops.subdivide_edges.
+
+            Subdividing two opposite edges of a quad cuts it across, so the whole ring is cut natively.
+            Edges with a different number of segments are subdivided separately.
+        """
+
+        bm = self.bm
+        segments = self.get_segment_counts(num_segs)
+
+        bm.edges.ensure_lookup_table()
+        bm.faces.ensure_lookup_table()
+        cut_edges = [bm.edges[edge_idx] for edge_idx in self.cut_edges.tolist()]
+        # Maps the end vertices of each cut edge to the edge
+        edge_lookup = {frozenset(bm_edge.verts): edge_idx for bm_edge, edge_idx in zip(cut_edges, self.cut_edges.tolist())}
+
+        # The split faces keep the index of the face they come from in a temporary layer
+        origin = bm.faces.layers.int.new(ORIGIN_LAYER)
+        for face_idx in self.edges_lookup:
+            bm.faces[face_idx][origin] = face_idx + 1
+
+        split_edges = set()
+        split_verts = set()
+        inner_edges = []
+        for count in np.unique(segments).tolist():
+            ret = bmesh.ops.subdivide_edges(bm, edges=[cut_edges[row] for row in np.flatnonzero(segments == count)],
+                                            cuts=count, use_grid_fill=False, use_single_edge=False)
+
+            for bm_element in ret['geom_split']:
+                if isinstance(bm_element, BMEdge):
+                    split_edges.add(bm_element)
+                elif isinstance(bm_element, BMVert):
+                    split_verts.add(bm_element)
+
+            inner_edges.extend(bm_element for bm_element in ret['geom_inner'] if isinstance(bm_element, BMEdge))
+
+        bm.verts.index_update()
+        bm.edges.index_update()
+        bm.faces.index_update()
+
+        # The new vertices of an edge are chained by its split parts, the parts at both ends lead to its end vertices
+        visited = set()
+        for bm_vert in split_verts:
+            if bm_vert in visited:
+                continue
+
+            chain = []
+            ends = []
+            parts = set()
+            stack = [bm_vert]
+            visited.add(bm_vert)
+            while stack:
+                vert = stack.pop()
+                chain.append(vert)
+                for bm_edge in vert.link_edges:
+                    if bm_edge not in split_edges:
+                        continue
+
+                    parts.add(bm_edge)
+                    other = bm_edge.other_vert(vert)
+                    if other not in split_verts:
+                        ends.append(other)
+                    elif other not in visited:
+                        visited.add(other)
+                        stack.append(other)
+
+            edge_idx = edge_lookup[frozenset(ends)]
+            # Order the vertices along the edge, like create_geometry does
+            start_co, end_co = self.edge_vert_pair[edge_idx]
+            chain.sort(key=lambda vert: get_perc_along(start_co, end_co, vert.co))
+            self.ordered_verts[edge_idx] = [vert.index for vert in chain]
+            for vert in chain:
+                self.orig_vert_coords[vert.index] = vert.co.copy()
+
+            for bm_edge in parts:
+                if select:
+                    bm_edge.select = True
+                self.tagged.add(bm_edge.index)
+                if bm_edge.index != edge_idx:
+                    self.selected_edge_lookup[bm_edge.index] = edge_idx
+
+        faces = set()
+        # The new edges stay unselected, like the ones create_geometry connects
+        for bm_edge in inner_edges:
+            self.tagged.add(bm_edge.index)
+            self.ignore_edges.add(bm_edge.index)
+            faces.update(bm_edge.link_faces)
+
+        # The faces next to the ring got new corners without being split. They keep their index.
+        for bm_edge in split_edges:
+            faces.update(bm_edge.link_faces)
+
+        self.face_origins = np.array([(bm_face.index, bm_face[origin] - 1 if bm_face[origin] else bm_face.index)
+                                      for bm_face in faces], dtype=np.int64).reshape(-1, 2)
+        bm.faces.layers.int.remove(origin)
+
+    def pinch_edges(self, num_segs, pinch, even, update=False):
+        bm = self.bm
+
+        scale_factors = dict(zip(self.cut_edges.tolist(), self.get_scale_factors(num_segs, pinch, even).tolist()))
+
+        moved = {}
+        bm.verts.ensure_lookup_table()
+        for edges in self.edges_lookup.values():
+            for i in range(0, len(edges)):
+                edge_idx = edges[i]
+
+                # Don't move vertices if they have already been moved
+                if edge_idx not in moved:
+                    verts = self.ordered_verts[edge_idx]
+
+                    if update:
+                        for vert in verts:
+                            bm_vert = bm.verts[vert]
+                            bm_vert.co = self.orig_vert_coords[vert]
+
+                    start = self.edge_vert_pair[edge_idx][0]
+                    end = self.edge_vert_pair[edge_idx][1]
+
+                    scale_verts_along_edge(bm, verts, start, end, scale_factors[edge_idx])
+
+                moved[edge_idx] = True
+
+        if update:
+            bmesh.update_edit_mesh(self.mesh)
+
+        return
+
+    def prepare_slide(self, num_segs):
+        """ Find the row and column in the cut arrays of each new vertex of the last rebuild. """
+
+        bm = self.bm
+        bm.verts.ensure_lookup_table()
+        rows = {edge_idx: row for row, edge_idx in enumerate(self.cut_edges.tolist())}
+
+        verts = []
+        vert_rows = []
+        orig_coords = []
+        for edge_idx, vert_indices in self.ordered_verts.items():
+            row = rows.get(edge_idx)
+            if row is None:
+                continue
+
+            for vert_idx in vert_indices:
+                verts.append(bm.verts[vert_idx])
+                vert_rows.append(row)
+                orig_coords.append(self.orig_vert_coords[vert_idx])
+
+        vert_rows = np.array(vert_rows, dtype=np.int64)
+        orig_coords = np.array(orig_coords, dtype=np.float64).reshape(-1, 3)
+
+        # Subdividing spaces the new vertices evenly, so their original position gives their column
+        along = get_edge_params(orig_coords, self.cut_starts[vert_rows], self.cut_ends[vert_rows])
+        vert_segs = self.get_segment_counts(num_segs)[vert_rows]
+
+        self.slide_verts = verts
+        self.slide_rows = vert_rows
+        self.slide_cols = np.clip(np.rint(along * (vert_segs + 1)).astype(np.int64) - 1, 0, vert_segs - 1)
+
+    def slide_edges(self, num_segs, pinch, even, slide, update=False):
+        """ Move the new vertices along their edges, pinched and slid, in one pass. The topology is not touched. """
+
+        if self.slide_verts is None:
+            self.prepare_slide(num_segs)
+
+        if not self.slide_verts:
+            return
+
+        positions = get_cut_positions(self.cut_starts, self.cut_ends, self.get_cut_params(num_segs, pinch, even, slide))
+        coords = positions[self.slide_rows, self.slide_cols].tolist()
+
+        for bm_vert, co in zip(self.slide_verts, coords):
+            bm_vert.co = co
+
+        if update:
+            bmesh.update_edit_mesh(self.mesh)
+
+    def read_attributes(self, mesh):
+        """ Keep the corner attributes and custom normals of the mesh before it is connected. Must be called in object mode. """
+
+        self.source_corners = {name: (field, get_layer_values(mesh, name, field, width))
+                               for name, field, width in get_attribute_layers(mesh, 'CORNER')}
+        self.source_normals = get_corner_normals(mesh) if mesh.has_custom_normals else None
+        self.source_corner_faces, self.source_corner_verts = get_corner_topology(mesh)
+        self.source_num_verts = len(mesh.vertices)
+
+    def get_new_verts(self):
+        """ The new vertices of the last rebuild and the row in the cut arrays of the edge each was created on. """
+
+        rows = {edge_idx: row for row, edge_idx in enumerate(self.cut_edges.tolist())}
+        new_verts = []
+        new_rows = []
+        for edge_idx, vert_indices in self.ordered_verts.items():
+            row = rows.get(edge_idx)
+            if row is not None:
+                new_verts.extend(vert_indices)
+                new_rows.extend([row] * len(vert_indices))
+
+        return np.array(new_verts, dtype=np.int64), np.array(new_rows, dtype=np.int64)
+
+    def interpolate_weights(self, bm):
+        """ Blend the vertex group weights of the new vertices of the last rebuild through the deform layer of bm.
+
+            Each new vertex gets the weights of the ends of its edge, interpolated at its final position along it.
+            The weights are blended as sparse entries, so the number of groups doesn't matter. Reading and writing
+            the deform layer is one Python step per (vertex, group) entry, which bmesh offers no bulk access for.
+        """
+
+        deform = bm.verts.layers.deform.active
+        if deform is None:
+            return
+
+        new_verts, new_rows = self.get_new_verts()
+        if len(new_verts) == 0:
+            return
+
+        bm.verts.ensure_lookup_table()
+        # Every end vertex is read once, its row in end_verts is looked up through the inverse
+        end_verts, end_rows = np.unique(self.cut_verts[new_rows], return_inverse=True)
+        end_rows = end_rows.reshape(-1, 2)
+
+        end_dverts = [bm.verts[vert_idx][deform] for vert_idx in end_verts.tolist()]
+        entries = [(row, group, weight) for row, dvert in enumerate(end_dverts) for group, weight in dvert.items()]
+        if not entries:
+            return
+
+        rows, groups, weights = (np.array(column) for column in zip(*entries))
+
+        new_bm_verts = [bm.verts[vert_idx] for vert_idx in new_verts.tolist()]
+        coords = np.array([bm_vert.co for bm_vert in new_bm_verts], dtype=np.float64).reshape(-1, 3)
+        end_coords = np.array([bm.verts[vert_idx].co for vert_idx in end_verts.tolist()], dtype=np.float64).reshape(-1, 3)
+        params = get_edge_params(coords, end_coords[end_rows[:, 0]], end_coords[end_rows[:, 1]])
+
+        # All entries at once. A new vertex is in the groups of both its ends.
+        rows, groups, weights = interpolate_entries(rows, groups, weights, end_rows[:, 0], end_rows[:, 1], params)
+
+        new_dverts = [bm_vert[deform] for bm_vert in new_bm_verts]
+        for dvert in new_dverts:
+            dvert.clear()
+
+        for row, group, weight in zip(rows.tolist(), groups.tolist(), weights.tolist()):
+            new_dverts[row][group] = weight
+
+    def get_edited_coords(self, mesh):
+        """ Vertex coordinates of the shape the cuts were made on, the active shape key in edit mode. """
+
+        data = mesh.vertices
+        if self.obj is not None and mesh.shape_keys is not None and self.obj.active_shape_key is not None:
+            data = self.obj.active_shape_key.data
+
+        coords = np.empty(len(mesh.vertices) * 3)
+        data.foreach_get("co", coords)
+        return coords.reshape(-1, 3)
+
+    def interpolate_attributes(self, mesh):
+        """ Interpolate the point and corner attributes, the shape keys and the custom normals of the elements
+            created by the last rebuild.
+
+            The new vertices and the corners of the split faces get the values of their source edge,
+            interpolated at their final position along it. Works on the mesh data, so it must be called in object mode
+            after the rebuild was written to the mesh.
+        """
+
+        new_verts, new_rows = self.get_new_verts()
+        if len(new_verts) == 0:
+            return
+
+        # The parameters include the pinch and slide, so they are measured on the shape that was edited
+        coords = self.get_edited_coords(mesh)
+        starts = self.cut_verts[new_rows, 0]
+        ends = self.cut_verts[new_rows, 1]
+        params = get_edge_params(coords[new_verts], coords[starts], coords[ends])
+
+        # The original vertices keep their indices, so the point attributes are read from the mesh itself
+        for name, field, width in get_attribute_layers(mesh, 'POINT'):
+            values = get_layer_values(mesh, name, field, width)
+            values[new_verts] = interpolate_rows(values, starts, ends, params)
+            set_layer_values(mesh, name, field, values)
+
+        if mesh.shape_keys is not None:
+            # Every key moves the new vertices along its own version of the edges, all keys at once
+            key_coords = get_shape_key_coords(mesh)
+            key_coords[:, new_verts] = interpolate_rows(key_coords, starts, ends, params)
+            set_shape_key_coords(mesh, key_coords)
+
+            vert_coords = np.empty(len(mesh.vertices) * 3)
+            mesh.vertices.foreach_get("co", vert_coords)
+            vert_coords = vert_coords.reshape(-1, 3)
+            vert_coords[new_verts] = interpolate_rows(vert_coords, starts, ends, params)
+            mesh.vertices.foreach_set("co", vert_coords.ravel())
+
+        if (not self.source_corners and self.source_normals is None) or len(self.face_origins) == 0:
+            return
+
+        # Corners of the faces created by the last rebuild
+        corner_faces, corner_verts = get_corner_topology(mesh)
+        face_origins = np.full(len(mesh.polygons), -1, dtype=np.int64)
+        face_origins[self.face_origins[:, 0]] = self.face_origins[:, 1]
+        corners = np.flatnonzero(face_origins[corner_faces] >= 0)
+        origins = face_origins[corner_faces[corners]]
+        verts = corner_verts[corners]
+
+        # Row of the source edge of each new vertex, -1 for the original vertices
+        vert_rows = np.full(len(mesh.vertices), -1, dtype=np.int64)
+        vert_rows[new_verts] = new_rows
+        vert_params = np.zeros(len(mesh.vertices))
+        vert_params[new_verts] = params
+
+        corner_rows = vert_rows[verts]
+        is_new = corner_rows >= 0
+        # Original vertices copy the corner of their face, new vertices blend the corners at the ends of their edge
+        start_verts = np.where(is_new, self.cut_verts[corner_rows, 0], verts)
+        end_verts = np.where(is_new, self.cut_verts[corner_rows, 1], verts)
+
+        find = (self.source_corner_faces, self.source_corner_verts, self.source_num_verts)
+        start_corners = find_corners(*find, origins, start_verts)
+        end_corners = find_corners(*find, origins, end_verts)
+
+        valid = (start_corners >= 0) & (end_corners >= 0)
+        corners = corners[valid]
+        start_corners = start_corners[valid]
+        end_corners = end_corners[valid]
+        corner_params = vert_params[verts[valid]]
+
+        for name, (field, source) in self.source_corners.items():
+            values = get_layer_values(mesh, name, field, source.shape[1])
+            values[corners] = interpolate_rows(source, start_corners, end_corners, corner_params)
+            set_layer_values(mesh, name, field, values)
+
+        if self.source_normals is not None and mesh.has_custom_normals:
+            # The other corners keep their normals, only the split faces get the normals of the faces they came from
+            normals = get_corner_normals(mesh)
+            split_normals = interpolate_rows(self.source_normals, start_corners, end_corners, corner_params)
+            lengths = np.linalg.norm(split_normals, axis=1, keepdims=True)
+            normals[corners] = np.divide(split_normals, lengths, out=normals[corners], where=lengths > 0.0)
+            mesh.normals_split_custom_set(normals)
+
+
+def connect_edges(data: Union[BMesh, bpy.types.Mesh], edges: Iterable[int], segments=1, pinch=0, even='NO', slide=0.0,
+                  spacing=0.0, segment_counts=None):
+    """ Connect edges of a bmesh or a mesh without going through the operator.
+
+        Works in any mode and never switches modes. A bmesh is modified in place and stays owned by the caller.
+        Its select mode and selection are left alone, but the indices of its elements are updated.
+        A mesh is written back directly, or through its edit bmesh if it is in edit mode.
+        The attributes and shape keys of the new elements are only interpolated for meshes in object mode,
+        as they are written through the mesh data.
+
+        Args:
+            data: The BMesh or Mesh to modify.
+            edges: Indices of the edges to connect.
+            segments: Number of new edges between each pair of connected edges.
+            pinch: Pinch value between -100 and 100.
+            even: One of 'NO', 'IN', 'OUT', 'RING_IN' or 'RING_OUT'.
+            slide: Slide the new edges along the connected edges, between -1 and 1.
+            spacing: If above 0, the distance between the new edges in local space. It replaces segments with
+            a number of segments per strip of faces.
+            segment_counts: Number of segments of each edge of the mesh, for instance from utils.get_edge_segments.
+            Each strip of faces uses the largest count of its edges, strips without counts (below 1) use segments.
+            Replaces spacing.
+    """
+
+    if segments < 1:
+        raise ValueError("segments must be at least 1, got {0}".format(segments))
+    if not -100 <= pinch <= 100:
+        raise ValueError("pinch must be between -100 and 100, got {0}".format(pinch))
+    if even not in ('NO', 'IN', 'OUT', 'RING_IN', 'RING_OUT'):
+        raise ValueError("even must be one of 'NO', 'IN', 'OUT', 'RING_IN' or 'RING_OUT', got {0!r}".format(even))
+    if not -1 <= slide <= 1:
+        raise ValueError("slide must be between -1 and 1, got {0}".format(slide))
+    if spacing < 0:
+        raise ValueError("spacing must be at least 0, got {0}".format(spacing))
+
+    if isinstance(data, bpy.types.Mesh):
+        if data.is_editmode:
+            connect_edges(bmesh.from_edit_mesh(data), edges, segments, pinch, even, slide, spacing, segment_counts)
+            bmesh.update_edit_mesh(data, destructive=True)
+        else:
+            bm = bmesh.new()
+            try:
+                bm.from_mesh(data)
+                connector = EdgeConnector(None)
+                connector.read_attributes(data)
+                connect_bmesh(bm, edges, segments, pinch, even, slide, spacing, segment_counts, connector)
+                bm.to_mesh(data)
+                connector.interpolate_attributes(data)
+                data.update()
+            finally:
+                bm.free()
+
+        return
+
+    connect_bmesh(data, edges, segments, pinch, even, slide, spacing, segment_counts)
+
+
+def connect_bmesh(bm: BMesh, edges: Iterable[int], segments, pinch, even, slide, spacing, segment_counts,
+                  connector=None):
+    """ Connect edges of a bmesh in place, through connector if given. """
+
+    # The connector looks up elements by index
+    bm.verts.index_update()
+    bm.edges.index_update()
+    bm.faces.index_update()
+    ensure(bm)
+
+    # The bmesh is only read while preparing, so it can serve as the initial bmesh too
+    if connector is None:
+        connector = EdgeConnector(None)
+    connector.initial_bm = bm
+    connector.selected_edges = set(edges)
+
+    connector.prepare()
+    if segment_counts is not None:
+        segments = connector.get_strip_segments(segment_counts, segments)
+    elif spacing > 0:
+        segments = connector.get_spacing_segments(spacing)
+    # The selection of the caller's bmesh is left as it was
+    connector.connect(bm, segments, pinch, even, slide, select=False)
+    connector.interpolate_weights(bm)
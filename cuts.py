@@ -0,0 +1,533 @@
+""" Arithmetic of the cuts, computed from the original topology with numpy only.
+
+    Nothing in here touches bpy or bmesh, so the cut positions can be computed and checked outside of Blender.
+"""
+
+import numpy as np
+
+
+def get_scale_factors(edge_lengths, num_segs, pinch, even, min_length):
+    """ Calculates the factor each edge's new vertices are scaled by around the edge midpoint.
+
+        Args:
+            edge_lengths: (n,) array of the lengths of the selected edges.
+            num_segs: Number of segments, or (n,) array of the number of segments of each edge.
+            pinch: Pinch value between -100 and 100.
+            even: 'NO', 'IN', 'OUT', 'RING_IN' or 'RING_OUT'. With 'IN' the distance from the midpoint to the farthest
+            new vertex is the same on every edge, with 'OUT' the distance from the farthest new vertex to the end point.
+            Both are bounded by min_length. The 'RING_' modes are the same, with a min_length per ring.
+            min_length: The smallest selected edge length, or (n,) array of the smallest length of each edge's ring.
+
+        Returns:
+            (n,) array of scale factors.
+    """
+
+    edge_lengths = np.asarray(edge_lengths, dtype=np.float64)
+    num_segs = np.broadcast_to(np.asarray(num_segs, dtype=np.float64), edge_lengths.shape)
+    # Edges with a single new vertex aren't scaled
+    single = num_segs <= 1
+    if single.all():
+        return np.ones(len(edge_lengths))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if pinch >= 0:
+            scale_factor = np.minimum(1 + (0.01 * pinch / ((num_segs - 1) / 2)), 1 + (2 / (num_segs - 1)))
+        else:
+            scale_factor = np.full(edge_lengths.shape, max(1 + (0.01 * pinch), 0))
+
+        if even == 'NO':
+            return np.where(single, 1.0, scale_factor)
+
+        length = min_length
+        # Distance from the midpoint to the farthest point
+        dist_from_mid = ((length / 2 * (num_segs - 1)) / (num_segs + 1)) * scale_factor
+
+        # Distance from the midpoint to the farthest point on each edge
+        dist_from_mid2 = (edge_lengths / 2 * (num_segs - 1)) / (num_segs + 1)
+
+        if even in ('OUT', 'RING_OUT'):
+            # Distance from farthest point to the end point
+            dist_to_end = (length / 2 - dist_from_mid)
+
+            # Distance from the the farthest point on each edge to the end point.
+            dist_to_end2 = (edge_lengths / 2) - dist_from_mid2
+
+            desired_dist = dist_from_mid2 + (dist_to_end2 - dist_to_end)
+        else:
+            desired_dist = dist_from_mid
+
+        factors = desired_dist / dist_from_mid2
+
+    # Zero length edges can't be scaled
+    return np.where(single | ~(dist_from_mid2 > 0.0), 1.0, factors)
+
+
+def get_cut_params(num_segs, scale_factors):
+    """ Parameters of the new vertices along their edges, from start (0) to end (1).
+
+        Args:
+            num_segs: Number of segments, or (n,) array of the number of segments of each edge.
+            scale_factors: (n,) array from get_scale_factors.
+
+        Returns:
+            (n, num_segs) array, sorted along each edge. With an array of segments the width is the largest number
+            of segments, the columns past the number of segments of an edge are not used.
+    """
+
+    scale_factors = np.asarray(scale_factors)
+    if np.ndim(num_segs) == 0:
+        base = np.arange(1, num_segs + 1) / (num_segs + 1)
+    else:
+        num_segs = np.asarray(num_segs)
+        width = num_segs.max() if len(num_segs) else 0
+        base = np.arange(1, width + 1) / (num_segs[:, None] + 1)
+
+    return 0.5 + (base - 0.5) * scale_factors[:, None]
+
+
+def get_cut_positions(starts, ends, params):
+    """ Coordinates of the new vertices.
+
+        Args:
+            starts: (n, 3) array with the start of each edge.
+            ends: (n, 3) array with the end of each edge.
+            params: (n, num_segs) array from get_cut_params.
+
+        Returns:
+            (n, num_segs, 3) array.
+    """
+
+    starts = np.asarray(starts)
+    return starts[:, None, :] + (np.asarray(ends) - starts)[:, None, :] * params[..., None]
+
+
+def get_cut_lines(positions, pairs, num_segs=None):
+    """ End points of the new edges, two per edge, in the order create_geometry connects the vertices.
+
+        Args:
+            positions: (n, num_segs, 3) array from get_cut_positions.
+            pairs: (m, 4) int array. Each row holds two consecutive selected edges of a face, edge a and edge b,
+            followed by a flag per edge that is 1 when the face walks that edge from its end to its start.
+            num_segs: (n,) array of the number of segments of each edge. All the columns of positions by default.
+
+        Returns:
+            (k * 2, 3) array, ready to be drawn as lines.
+    """
+
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 4)
+    width = positions.shape[1]
+    if len(pairs) == 0 or width == 0:
+        return np.empty((0, 3), dtype=positions.dtype)
+
+    edge_a, edge_b, flip_a, flip_b = pairs.T
+    if num_segs is None:
+        num_segs = np.full(len(positions), width)
+    # Both edges of a pair have the same number of segments
+    num_segs = np.asarray(num_segs)[edge_a, None]
+
+    # The j-th vertex of edge b in face order is connected to the j-th last vertex of edge a
+    j = np.arange(width // 2 + width % 2)
+    idx_b = np.where(flip_b[:, None], num_segs - 1 - j, j)
+    idx_a = np.where(flip_a[:, None], j, num_segs - 1 - j)
+
+    lines = np.empty((len(pairs), len(j), 2, 3), dtype=positions.dtype)
+    lines[:, :, 0] = positions[edge_b[:, None], idx_b]
+    lines[:, :, 1] = positions[edge_a[:, None], idx_a]
+
+    # Drop the lines past the number of segments of each pair
+    return lines[j < (num_segs + 1) // 2].reshape(-1, 3)
+
+
+def get_slide_signs(num_edges, pairs):
+    """ Direction each edge slides in, so that all the cuts of a ring slide towards the same side.
+
+        Args:
+            num_edges: Number of selected edges.
+            pairs: (m, 4) int array, see get_cut_lines.
+
+        Returns:
+            (num_edges,) array of 1 where an edge slides towards its end and -1 where it slides towards its start.
+    """
+
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 4)
+    signs = np.zeros(num_edges, dtype=np.int64)
+
+    neighbors = [[] for _ in range(num_edges)]
+    for edge_a, edge_b, flip_a, flip_b in pairs.tolist():
+        # Connected vertices run in opposite directions in face order
+        relation = -1 if flip_a == flip_b else 1
+        neighbors[edge_a].append((edge_b, relation))
+        neighbors[edge_b].append((edge_a, relation))
+
+    for seed in range(num_edges):
+        if signs[seed] != 0:
+            continue
+
+        signs[seed] = 1
+        stack = [seed]
+        while stack:
+            edge = stack.pop()
+            for other, relation in neighbors[edge]:
+                # Keep the first direction found on rings that can't be oriented
+                if signs[other] == 0:
+                    signs[other] = signs[edge] * relation
+                    stack.append(other)
+
+    return signs
+
+
+def get_slide_params(params, signs, amount):
+    """ Parameters of the new vertices after sliding them along their edges.
+
+        Args:
+            params: (n, num_segs) array from get_cut_params.
+            signs: (n,) array from get_slide_signs.
+            amount: Between -1 and 1. At 1 or -1 the outer new vertex of each edge reaches an end point.
+
+        Returns:
+            (n, num_segs) array.
+    """
+
+    if amount == 0 or params.shape[1] == 0:
+        return params
+
+    # Distance from the outer new vertices to the end points
+    room = params[:, :1]
+    return params + amount * np.asarray(signs)[:, None] * room
+
+
+def get_edge_params(coords, starts, ends):
+    """ Parameter of each point projected on its edge, from start (0) to end (1). 0 on zero length edges. """
+
+    direction = ends - starts
+    length_sq = np.einsum('ij,ij->i', direction, direction)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        params = np.einsum('ij,ij->i', coords - starts, direction) / length_sq
+
+    return np.nan_to_num(params)
+
+
+def find_corners(corner_faces, corner_verts, num_verts, faces, verts):
+    """ Corner of each face and vertex pair.
+
+        Args:
+            corner_faces: (l,) array with the face of each corner of a mesh.
+            corner_verts: (l,) array with the vertex of each corner.
+            num_verts: Number of vertices of the mesh.
+            faces: (k,) array of faces to look up.
+            verts: (k,) array of vertices to look up.
+
+        Returns:
+            (k,) array of corner indices, -1 where the face doesn't use the vertex.
+    """
+
+    queries = np.asarray(faces, dtype=np.int64) * num_verts + verts
+    if len(corner_faces) == 0:
+        return np.full(len(queries), -1, dtype=np.int64)
+
+    keys = np.asarray(corner_faces, dtype=np.int64) * num_verts + corner_verts
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    found = np.minimum(np.searchsorted(sorted_keys, queries), len(sorted_keys) - 1)
+    return np.where(sorted_keys[found] == queries, order[found], -1)
+
+
+def interpolate_rows(values, starts, ends, params):
+    """ Rows of values interpolated between the rows starts and ends.
+
+        Args:
+            values: (..., m, width) array. The leading axes, one per shape key for instance, are interpolated at once.
+            starts: (k,) array of rows to interpolate from.
+            ends: (k,) array of rows to interpolate to.
+            params: (k,) array of parameters, from start (0) to end (1).
+
+        Returns:
+            (..., k, width) array.
+    """
+
+    start_values = values[..., starts, :]
+    return start_values + (values[..., ends, :] - start_values) * np.asarray(params)[:, None]
+
+
+def interpolate_entries(rows, cols, values, starts, ends, params):
+    """ Sparse interpolate_rows: rows given as (row, column, value) entries, missing entries being 0.
+
+        An interpolated row has an entry in every column either of its rows has one in. Nothing is done per column,
+        so the cost depends on the number of entries, not on the number of columns.
+
+        Args:
+            rows: (e,) array with the row of each entry.
+            cols: (e,) array with the column of each entry.
+            values: (e,) array with the value of each entry.
+            starts: (k,) array of rows to interpolate from.
+            ends: (k,) array of rows to interpolate to.
+            params: (k,) array of parameters, from start (0) to end (1).
+
+        Returns:
+            A (rows, cols, values) tuple with the entries of the k interpolated rows, sorted by row and column.
+    """
+
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    if len(cols) == 0 or len(starts) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+
+    num_cols = cols.max() + 1
+    num_rows = max(rows.max(), starts.max(), ends.max()) + 1
+
+    keys = rows * num_cols + cols
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    cols = cols[order]
+    values = values[order]
+
+    # Entries of each row
+    row_starts = np.searchsorted(keys, np.arange(num_rows) * num_cols)
+    row_counts = np.diff(np.append(row_starts, len(keys)))
+
+    def gather(source_rows):
+        counts = row_counts[source_rows]
+        owners = np.repeat(np.arange(len(source_rows)), counts)
+        first = np.repeat(row_starts[source_rows] - (np.cumsum(counts) - counts), counts)
+        return owners, first + np.arange(len(owners))
+
+    owners_a, entries_a = gather(starts)
+    owners_b, entries_b = gather(ends)
+    out_keys = np.concatenate((owners_a * num_cols + cols[entries_a], owners_b * num_cols + cols[entries_b]))
+    # Sorted unique keys, sorting in place is much faster than np.unique here
+    out_keys.sort()
+    out_keys = out_keys[np.append(True, out_keys[1:] != out_keys[:-1])] if len(out_keys) else out_keys
+    out_rows = out_keys // num_cols
+    out_cols = out_keys % num_cols
+
+    def lookup(source_rows):
+        queries = source_rows[out_rows] * num_cols + out_cols
+        found = np.minimum(np.searchsorted(keys, queries), len(keys) - 1)
+        return np.where(keys[found] == queries, values[found], 0.0)
+
+    start_values = lookup(starts)
+    return out_rows, out_cols, start_values + (lookup(ends) - start_values) * np.asarray(params)[out_rows]
+
+
+def get_edge_keys(edge_verts, num_verts):
+    """ Lookup table of the edges of a mesh for find_edges.
+
+        Args:
+            edge_verts: (e, 2) array with the two vertices of each edge.
+            num_verts: Number of vertices of the mesh.
+
+        Returns:
+            A (keys, order) tuple of the sorted edge keys and the edge index of each.
+    """
+
+    edge_verts = np.sort(np.asarray(edge_verts, dtype=np.int64).reshape(-1, 2), axis=1)
+    keys = edge_verts[:, 0] * num_verts + edge_verts[:, 1]
+    order = np.argsort(keys, kind='stable')
+    return keys[order], order
+
+
+def find_edges(edge_keys, num_verts, verts_a, verts_b):
+    """ Edge between each pair of vertices.
+
+        Args:
+            edge_keys: Lookup table from get_edge_keys.
+            num_verts: Number of vertices of the mesh.
+            verts_a: (k,) array of vertices, -1 for none.
+            verts_b: (k,) array of vertices, -1 for none.
+
+        Returns:
+            (k,) array of edge indices, -1 where the vertices aren't connected.
+    """
+
+    sorted_keys, order = edge_keys
+    verts_a = np.asarray(verts_a, dtype=np.int64)
+    verts_b = np.asarray(verts_b, dtype=np.int64)
+    if len(sorted_keys) == 0:
+        return np.full(len(verts_a), -1, dtype=np.int64)
+
+    queries = np.minimum(verts_a, verts_b) * num_verts + np.maximum(verts_a, verts_b)
+    found = np.minimum(np.searchsorted(sorted_keys, queries), len(sorted_keys) - 1)
+    valid = (sorted_keys[found] == queries) & (verts_a >= 0) & (verts_b >= 0)
+    return np.where(valid, order[found], -1)
+
+
+# Most cells per axis of a point grid, so the cell keys fit in an int64
+MAX_GRID_CELLS = 2 ** 20
+
+
+def get_point_grid(coords, distance):
+    """ Lookup table of points for find_mirror_points, a grid of cells at least twice distance wide.
+
+        Args:
+            coords: (n, 3) array of points.
+            distance: Largest distance find_mirror_points accepts.
+
+        Returns:
+            A (cell_size, low, dims, keys, order) tuple: the grid layout, the sorted cell keys and the point of each.
+    """
+
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+    extent = np.ptp(coords, axis=0).max() if len(coords) else 0.0
+    cell_size = max(2.0 * distance, extent / MAX_GRID_CELLS)
+
+    cells = np.floor(coords / cell_size).astype(np.int64)
+    # One empty cell on each side, so every neighbour of a cell is in the grid
+    low = cells.min(axis=0) - 1 if len(cells) else np.zeros(3, dtype=np.int64)
+    dims = cells.max(axis=0) - low + 2 if len(cells) else np.ones(3, dtype=np.int64)
+
+    keys = np.ravel_multi_index((cells - low).T, dims)
+    order = np.argsort(keys, kind='stable')
+    return cell_size, low, dims, keys[order], order
+
+
+def find_mirror_points(grid, coords, points, distance):
+    """ Closest point to the mirror of each of some points across the X axis.
+
+        Only the points of the 8 cells nearest to each mirrored point are compared, so nothing is done per point
+        of the grid.
+
+        Args:
+            grid: Lookup table from get_point_grid, built from coords.
+            coords: (n, 3) array of points.
+            points: (k,) array of points to mirror.
+            distance: Largest distance between a mirrored point and the point found.
+
+        Returns:
+            (k,) array of points, -1 where none is within distance.
+    """
+
+    cell_size, low, dims, sorted_keys, order = grid
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+    points = np.asarray(points, dtype=np.int64)
+    found = np.full(len(points), -1, dtype=np.int64)
+    if len(points) == 0 or len(sorted_keys) == 0:
+        return found
+
+    mirrored = coords[points] * (-1.0, 1.0, 1.0)
+    offsets = np.stack(np.meshgrid((0, 1), (0, 1), (0, 1), indexing='ij'), axis=-1).reshape(-1, 3)
+    # Cells are twice distance wide, so the points within distance are in the cell of the mirrored point or
+    # in the next one on the side of the closest border, on each axis. (k, 8, 3) cells.
+    scaled = mirrored / cell_size
+    cells = np.floor(scaled).astype(np.int64)
+    sides = np.where(scaled - cells < 0.5, -1, 1)
+    cells = (cells - low)[:, None] + sides[:, None] * offsets
+    inside = np.all((cells >= 0) & (cells < dims), axis=2)
+
+    owners = np.broadcast_to(np.arange(len(points))[:, None], inside.shape)[inside]
+    queries = np.ravel_multi_index(cells[inside].T, dims)
+    starts = np.searchsorted(sorted_keys, queries, side='left')
+    counts = np.searchsorted(sorted_keys, queries, side='right') - starts
+
+    # Every point of those cells
+    owners = np.repeat(owners, counts)
+    positions = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(len(owners))
+    candidates = order[positions]
+
+    dists = np.linalg.norm(coords[candidates] - mirrored[owners], axis=1)
+    close = dists <= distance
+    owners, candidates, dists = owners[close], candidates[close], dists[close]
+
+    # The closest candidate of each point comes first
+    nearest = np.lexsort((dists, owners))
+    first = nearest[np.append(True, owners[nearest][1:] != owners[nearest][:-1])] if len(nearest) else nearest
+    found[owners[first]] = candidates[first]
+    return found
+
+
+def get_edge_groups(num_edges, pairs):
+    """ Connected ring or strip of each edge, the two edges of a pair being connected.
+
+        Union-find over all the pairs at once: the root of each pair's larger group is hooked to the smaller root,
+        then the paths are compressed, until every pair is in one group.
+
+        Args:
+            num_edges: Number of selected edges.
+            pairs: (m, 4) int array, see get_cut_lines.
+
+        Returns:
+            (num_edges,) array of group indices from 0 to the number of groups - 1.
+    """
+
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 4)
+    parents = np.arange(num_edges)
+    edge_a = pairs[:, 0]
+    edge_b = pairs[:, 1]
+
+    while True:
+        # Every parent is a root here
+        root_a = parents[edge_a]
+        root_b = parents[edge_b]
+        apart = root_a != root_b
+        if not apart.any():
+            break
+
+        np.minimum.at(parents,
+                      np.maximum(root_a[apart], root_b[apart]),
+                      np.minimum(root_a[apart], root_b[apart]))
+
+        while True:
+            grandparents = parents[parents]
+            if np.array_equal(grandparents, parents):
+                break
+            parents = grandparents
+
+    return np.unique(parents, return_inverse=True)[1].reshape(-1)
+
+
+def get_group_min_lengths(edge_lengths, groups):
+    """ Smallest edge length of the group of each edge.
+
+        Args:
+            edge_lengths: (n,) array of the lengths of the selected edges.
+            groups: (n,) array from get_edge_groups.
+
+        Returns:
+            (n,) array.
+    """
+
+    groups = np.asarray(groups, dtype=np.int64)
+    min_lengths = np.full(groups.max() + 1 if len(groups) else 0, np.inf)
+    np.minimum.at(min_lengths, groups, edge_lengths)
+    return min_lengths[groups]
+
+
+def get_spacing_segments(edge_lengths, groups, spacing):
+    """ Number of segments of each edge that spaces the new vertices about spacing apart.
+
+        The number is computed from the mean edge length of each ring or strip, so that the cuts of a strip line up.
+
+        Args:
+            edge_lengths: (n,) array of the lengths of the selected edges.
+            groups: (n,) array from get_edge_groups.
+            spacing: Distance between the new vertices, in the same space as edge_lengths.
+
+        Returns:
+            (n,) int array, at least 1.
+    """
+
+    groups = np.asarray(groups, dtype=np.int64)
+    mean_lengths = np.bincount(groups, weights=edge_lengths) / np.maximum(np.bincount(groups), 1)
+    counts = np.maximum(np.rint(mean_lengths / spacing).astype(np.int64) - 1, 1)
+    return counts[groups]
+
+
+def get_strip_segments(values, groups, default):
+    """ Number of segments of each edge from a count per edge, the same along each ring or strip.
+
+        Args:
+            values: (n,) int array with the number of segments of each edge, below 1 where it has none.
+            groups: (n,) array from get_edge_groups.
+            default: Number of segments of the strips that have no count.
+
+        Returns:
+            (n,) int array with the largest count of each edge's strip.
+    """
+
+    groups = np.asarray(groups, dtype=np.int64)
+    counts = np.zeros(groups.max() + 1 if len(groups) else 0, dtype=np.int64)
+    np.maximum.at(counts, groups, np.asarray(values, dtype=np.int64))
+    return np.where(counts >= 1, counts, default)[groups]
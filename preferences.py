@@ -21,8 +21,37 @@ class ConnectEdgesPreferences(AddonPreferences):
     selection_enabled: BoolProperty(name="Enable Selection", default=False, 
                                     description="Enable selection while the operator is running")
 
+    hover_highlight: BoolProperty(name="Highlight Ring Under Mouse", default=True,
+                                  description="Highlight the edge ring that a click would select")
+
     use_rcs: BoolProperty(name="Swap left and right mouse buttons (Enable if you use right click select)", default=False, description="")
 
+    preview_cuts: BoolProperty(name="Preview Cuts", default=False,
+                               description="Draw the cuts as an overlay while adjusting them and only build them on confirm. "
+                               "Faster on heavy meshes")
+
+    frame_budget: FloatProperty(name="Frame Budget (ms)", default=33.0, min=0.0, max=1000.0,
+                                description="While dragging or scrolling, draw a preview instead of rebuilding when a rebuild "
+                                "takes longer than this. The cuts are rebuilt once the input settles. 0 always rebuilds")
+
+    suspend_modifiers: BoolProperty(name="Suspend Heavy Modifiers", default=False,
+                                    description="Hide heavy modifiers in edit mode while the operator is running. "
+                                    "They are shown again when it finishes or is cancelled")
+
+    suspend_types: EnumProperty(name="Modifier Types", options={'ENUM_FLAG'},
+                                items=[("SUBSURF", "Subdivision Surface", ""),
+                                       ("MULTIRES", "Multiresolution", ""),
+                                       ("BEVEL", "Bevel", ""),
+                                       ("WEIGHTED_NORMAL", "Weighted Normal", ""),
+                                       ("SOLIDIFY", "Solidify", ""),
+                                       ("REMESH", "Remesh", ""),
+                                       ("BOOLEAN", "Boolean", "")],
+                                default={"SUBSURF", "BEVEL", "WEIGHTED_NORMAL"},
+                                description="Modifier types to hide")
+
+    suspend_time: FloatProperty(name="Evaluation Time (ms)", default=0.0, min=0.0, max=10000.0,
+                                description="Also hide modifiers whose last evaluation took at least this long. 0 only uses the types")
+
     show_hud: BoolProperty(name="Display the HUD", default=True, description="Display the HUD in the viewport.")
 
     show_keys: BoolProperty(name="Display Hotkeys", default=False, description="Display the hotkeys in the HUD")
@@ -59,7 +88,16 @@ class ConnectEdgesPreferences(AddonPreferences):
         layout.prop(self, "selection_enabled")
         if addon_prefs.selection_enabled:
             layout.label(text="Warning: Selection can be slow with high poly meshes. Selecting while the operator runs will break both adjust last op and repeat last op for that operator session", icon = 'ERROR')
+            layout.prop(self, "hover_highlight")
         layout.prop(self, "use_rcs")
+        layout.prop(self, "preview_cuts")
+        if not addon_prefs.preview_cuts:
+            layout.prop(self, "frame_budget")
+
+        layout.prop(self, "suspend_modifiers")
+        if addon_prefs.suspend_modifiers:
+            layout.prop(self, "suspend_types")
+            layout.prop(self, "suspend_time")
             
 
         layout.prop(self, "show_hud")
@@ -87,6 +125,8 @@ class ConnectEdgesPreferences(AddonPreferences):
         layout.label(text="CTRL + Middle Mouse: Increase/Decrease the number of segments.")
         layout.label(text="CTRL + Mouse Move: Increase/Decrease the pinch value.")
         layout.label(text="Right Click: Open numerical input box.")
+        layout.label(text="B / L: Box / Lasso select, then drag. Shift adds and CTRL removes. (Only works when selection is enabled)")
+        layout.label(text="G: Slide the new edges by moving the mouse. G, Space or click to keep, ESC or right click to reset.")
         layout.label(text="E: Change the even setting.")
         layout.label(text="     Even (In): The distance between all created edges are the same.")
         layout.label(text="     Even (Out): The distance between the outer edges are the same.")
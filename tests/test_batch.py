@@ -0,0 +1,83 @@
+""" Tests of the batch job queue. Run with python -m pytest tests, Blender is not needed. """
+
+import importlib.util
+import json
+import os
+import threading
+import time
+import types
+
+import pytest
+
+# Loaded on its own like cuts, bpy is optional in batch
+_spec = importlib.util.spec_from_file_location("batch", os.path.join(os.path.dirname(__file__), os.pardir, "batch.py"))
+batch = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(batch)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return batch.JobQueue(str(tmp_path))
+
+
+def test_two_workers_share_a_queue(queue, monkeypatch, capsys):
+    files = ["file{0}.blend".format(i) for i in range(20)]
+    queue.submit(files, {"segments": 2})
+
+    processed = []
+
+    def process_job(job):
+        # Long enough for the workers to interleave
+        time.sleep(0.005)
+        processed.append((threading.current_thread().name, job["file"]))
+        return {"file": job["file"], "meshes": 1, "edges": 2, "connect_time": 0.0, "time": 0.0}
+
+    monkeypatch.setattr(batch, "process_job", process_job)
+
+    results = {}
+
+    def run(worker_id):
+        args = types.SimpleNamespace(queue_worker=queue.path, worker_id=worker_id, exit_when_empty=True)
+        results[worker_id] = batch.run_queue_worker(args)
+
+    workers = [threading.Thread(target=run, args=(worker_id,), name=worker_id) for worker_id in ("0", "1")]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert results == {"0": 0, "1": 0}
+
+    # Every job was processed once, by either worker, and nothing is left behind
+    assert sorted(path for _, path in processed) == sorted(os.path.abspath(path) for path in files)
+    assert {name for name, _ in processed} == {"0", "1"}
+    assert len(os.listdir(queue.done)) == len(files)
+    assert os.listdir(queue.pending) == []
+    for worker_id in ("0", "1"):
+        assert os.listdir(queue.running_dir(worker_id)) == []
+        assert queue.fail(worker_id, "exited") == []
+
+
+def test_fail_completes_the_jobs_of_a_dead_worker(queue):
+    queue.submit(["a.blend", "b.blend"], {})
+    name, _ = queue.claim("1")
+
+    results = queue.fail("1", "Queue worker exited with code 1")
+
+    assert [result["file"] for result in results] == [os.path.abspath("a.blend")]
+    with open(os.path.join(queue.done, name)) as f:
+        assert json.load(f)["result"]["error"] == "Queue worker exited with code 1"
+
+    # Failed once only, the other job is still pending
+    assert queue.fail("1", "again") == []
+    assert len(os.listdir(queue.pending)) == 1
+
+
+def test_requeue_skips_stray_files(queue):
+    queue.submit(["a.blend"], {})
+    queue.claim("0")
+    open(os.path.join(queue.running, "stray.txt"), "w").close()
+
+    assert queue.requeue() == 1
+    assert len(os.listdir(queue.pending)) == 1
+    assert os.path.exists(os.path.join(queue.running, "stray.txt"))
@@ -0,0 +1,232 @@
+""" Tests of the cut arithmetic. Run with python -m pytest tests, Blender is not needed. """
+
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+
+# The package imports bpy, load the module on its own
+_spec = importlib.util.spec_from_file_location("cuts", os.path.join(os.path.dirname(__file__), os.pardir, "cuts.py"))
+cuts = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(cuts)
+
+
+def test_cut_lines_connect_opposite_vertices():
+    positions = np.arange(2 * 2 * 3, dtype=np.float64).reshape(2, 2, 3)
+
+    lines = cuts.get_cut_lines(positions, [(0, 1, 0, 0)])
+
+    # The first vertex of edge b goes to the last vertex of edge a
+    np.testing.assert_array_equal(lines, [positions[1, 0], positions[0, 1]])
+
+
+def test_cut_lines_per_edge_segments():
+    positions = np.arange(4 * 3 * 3, dtype=np.float64).reshape(4, 3, 3)
+    pairs = [(0, 1, 0, 0), (2, 3, 1, 0)]
+
+    lines = cuts.get_cut_lines(positions, pairs, num_segs=np.array([3, 3, 1, 1]))
+
+    expected = [positions[1, 0], positions[0, 2],
+                positions[1, 1], positions[0, 1],
+                # A single segment only uses the first column, whatever the flip
+                positions[3, 0], positions[2, 0]]
+    np.testing.assert_array_equal(lines, expected)
+
+
+def test_cut_lines_empty():
+    assert cuts.get_cut_lines(np.zeros((2, 3, 3)), []).shape == (0, 3)
+
+
+def test_scale_factors_per_edge_segments():
+    factors = cuts.get_scale_factors([1.0, 1.0, 1.0], np.array([1, 3, 5]), 50, 'NO', 1.0)
+
+    # A single new vertex stays on the midpoint and is never scaled
+    np.testing.assert_allclose(factors, [1.0, 1.5, 1.25])
+
+
+@pytest.mark.parametrize("num_segs", [2, 3, 7])
+def test_scale_factors_full_pinch_reaches_end_points(num_segs):
+    factors = cuts.get_scale_factors([1.0], num_segs, 100, 'NO', 1.0)
+    params = cuts.get_cut_params(num_segs, factors)
+
+    np.testing.assert_allclose(params[0, [0, -1]], [0.0, 1.0], atol=1e-12)
+
+
+def test_scale_factors_negative_pinch_is_clamped():
+    np.testing.assert_allclose(cuts.get_scale_factors([1.0], 3, -50, 'NO', 1.0), [0.5])
+    np.testing.assert_allclose(cuts.get_scale_factors([1.0], 3, -150, 'NO', 1.0), [0.0])
+
+
+def test_scale_factors_even_inside():
+    lengths = np.array([1.0, 2.0, 0.0])
+    factors = cuts.get_scale_factors(lengths, 3, 0, 'IN', 1.0)
+    params = cuts.get_cut_params(3, factors)
+
+    # The farthest new vertex is as far from the midpoint as on the shortest edge, zero length edges are left alone
+    np.testing.assert_allclose((params[:2, -1] - 0.5) * lengths[:2], [0.25, 0.25])
+    assert factors[2] == 1.0
+
+
+def test_slide_signs():
+    # Connected vertices run in opposite directions in face order, so edges walked the same way get opposite signs.
+    # Edge 3 is on its own.
+    signs = cuts.get_slide_signs(4, [(0, 1, 0, 0), (1, 2, 0, 1)])
+
+    np.testing.assert_array_equal(signs, [1, -1, -1, 1])
+
+
+def test_spacing_segments():
+    lengths = np.array([1.0, 3.0, 2.0, 0.1])
+    groups = np.array([0, 0, 1, 2])
+
+    counts = cuts.get_spacing_segments(lengths, groups, 0.5)
+
+    # The edges of a strip share its count, and short strips keep at least one segment
+    np.testing.assert_array_equal(counts, [3, 3, 3, 1])
+
+
+def test_slide_params():
+    params = cuts.get_cut_params(3, np.ones(2))
+
+    slid = cuts.get_slide_params(params, np.array([1, -1]), 1.0)
+
+    # At full slide the outer new vertex reaches the end point the edge slides to
+    np.testing.assert_allclose(slid, [[0.5, 0.75, 1.0], [0.0, 0.25, 0.5]])
+    np.testing.assert_allclose(cuts.get_slide_params(params, np.array([1, -1]), -0.5),
+                               [[0.125, 0.375, 0.625], [0.375, 0.625, 0.875]])
+    assert cuts.get_slide_params(params, np.array([1, -1]), 0) is params
+
+
+def test_edge_params():
+    starts = np.array([(0.0, 0.0, 0.0), (1.0, 1.0, 1.0)])
+    ends = np.array([(2.0, 0.0, 0.0), (1.0, 1.0, 1.0)])
+    coords = np.array([(0.5, 1.0, 0.0), (5.0, 5.0, 5.0)])
+
+    # Points are projected on their edge, zero length edges give 0
+    np.testing.assert_allclose(cuts.get_edge_params(coords, starts, ends), [0.25, 0.0])
+
+
+def test_find_corners():
+    # Two triangles sharing the edge between vertices 1 and 2
+    corner_faces = np.array([0, 0, 0, 1, 1, 1])
+    corner_verts = np.array([0, 1, 2, 2, 1, 3])
+
+    corners = cuts.find_corners(corner_faces, corner_verts, 4, [1, 0, 1, 0], [1, 2, 0, 3])
+
+    np.testing.assert_array_equal(corners, [4, 2, -1, -1])
+    np.testing.assert_array_equal(cuts.find_corners([], [], 4, [0], [0]), [-1])
+
+
+def test_interpolate_rows():
+    # Two shape keys of three vertices
+    values = np.array([[(0.0, 0.0, 0.0), (2.0, 0.0, 0.0), (0.0, 4.0, 0.0)],
+                       [(0.0, 0.0, 1.0), (2.0, 0.0, 1.0), (0.0, 4.0, 3.0)]])
+
+    rows = cuts.interpolate_rows(values, np.array([0, 1]), np.array([1, 2]), np.array([0.25, 0.5]))
+
+    np.testing.assert_allclose(rows, [[(0.5, 0.0, 0.0), (1.0, 2.0, 0.0)],
+                                      [(0.5, 0.0, 1.0), (1.0, 2.0, 2.0)]])
+    assert cuts.interpolate_rows(values[0], np.array([0]), np.array([2]), np.array([1.0])).shape == (1, 3)
+
+
+def test_find_edges():
+    edge_verts = np.array([(0, 1), (2, 1), (3, 0), (2, 3)])
+    edge_keys = cuts.get_edge_keys(edge_verts, 4)
+
+    # Either vertex order finds the edge, -1 for missing edges and vertices
+    edges = cuts.find_edges(edge_keys, 4, [1, 1, 0, 0, -1], [0, 2, 3, 2, 1])
+
+    np.testing.assert_array_equal(edges, [0, 1, 2, -1, -1])
+    np.testing.assert_array_equal(cuts.find_edges(cuts.get_edge_keys(np.empty((0, 2)), 4), 4, [0], [1]), [-1])
+
+
+def test_edge_groups():
+    pairs = [(0, 1, 0, 0), (1, 2, 0, 0), (4, 3, 0, 0)]
+
+    np.testing.assert_array_equal(cuts.get_edge_groups(6, pairs), [0, 0, 0, 1, 1, 2])
+
+
+def test_edge_groups_of_long_chains_and_rings():
+    num_edges = 1000
+    # A chain paired from its end, and a ring closed back on itself
+    chain = [(i + 1, i, 0, 0) for i in reversed(range(499))]
+    ring = [(500 + i, 500 + (i + 1) % 500, 0, 0) for i in range(500)]
+
+    groups = cuts.get_edge_groups(num_edges, chain + ring)
+
+    np.testing.assert_array_equal(groups, [0] * 500 + [1] * 500)
+    np.testing.assert_array_equal(cuts.get_edge_groups(3, []), [0, 1, 2])
+
+
+def test_group_min_lengths():
+    lengths = np.array([2.0, 0.5, 3.0, 4.0])
+    groups = np.array([0, 0, 1, 1])
+
+    np.testing.assert_allclose(cuts.get_group_min_lengths(lengths, groups), [0.5, 0.5, 3.0, 3.0])
+    assert len(cuts.get_group_min_lengths(np.empty(0), np.empty(0, dtype=np.int64))) == 0
+
+
+def test_strip_segments():
+    values = np.array([0, 3, 5, -1, 0])
+    groups = np.array([0, 0, 1, 1, 2])
+
+    # The largest count of each strip, strips without counts use the default
+    np.testing.assert_array_equal(cuts.get_strip_segments(values, groups, 2), [3, 3, 5, 5, 2])
+    assert len(cuts.get_strip_segments(np.empty(0), np.empty(0, dtype=np.int64), 2)) == 0
+
+
+def test_interpolate_entries_matches_dense_rows():
+    rng = np.random.default_rng(0)
+    num_rows, num_cols = 30, 40
+    dense = np.where(rng.random((num_rows, num_cols)) < 0.1, rng.random((num_rows, num_cols)), 0.0)
+    rows, cols = np.nonzero(dense)
+    # Entries don't have to be sorted
+    shuffle = rng.permutation(len(rows))
+    rows, cols = rows[shuffle], cols[shuffle]
+
+    starts = rng.integers(0, num_rows, 50)
+    ends = rng.integers(0, num_rows, 50)
+    params = rng.random(50)
+
+    out_rows, out_cols, values = cuts.interpolate_entries(rows, cols, dense[rows, cols], starts, ends, params)
+
+    expected = cuts.interpolate_rows(dense, starts, ends, params)
+    result = np.zeros_like(expected)
+    result[out_rows, out_cols] = values
+    np.testing.assert_allclose(result, expected)
+
+    # An entry wherever either row has one
+    members = (dense[starts] != 0) | (dense[ends] != 0)
+    np.testing.assert_array_equal(np.stack(np.nonzero(members)), np.stack((out_rows, out_cols)))
+
+
+def test_interpolate_entries_empty():
+    rows, cols, values = cuts.interpolate_entries([], [], [], [0], [1], [0.5])
+    assert len(rows) == len(cols) == len(values) == 0
+
+
+def test_find_mirror_points():
+    coords = np.array([(1.0, 2.0, 3.0), (-1.0, 2.0, 3.00005), (0.0, 1.0, 0.0), (5.0, 0.0, 0.0), (-5.0, 0.0, 0.001),
+                       (-1.0, 2.0, 3.0)])
+    grid = cuts.get_point_grid(coords, 0.0001)
+
+    # The closest point within distance, points on the axis are their own mirror
+    mirror = cuts.find_mirror_points(grid, coords, np.arange(5), 0.0001)
+
+    np.testing.assert_array_equal(mirror, [5, 0, 2, -1, -1])
+    assert len(cuts.find_mirror_points(grid, coords, np.empty(0, dtype=np.int64), 0.0001)) == 0
+
+
+def test_find_mirror_points_matches_brute_force():
+    rng = np.random.default_rng(1)
+    half = rng.random((500, 3)) * (10.0, 1.0, 1.0)
+    # Mirrored copies, slightly off, and a few points without a counterpart
+    coords = np.concatenate((half, half * (-1.0, 1.0, 1.0) + rng.normal(0.0, 0.00002, half.shape), rng.random((50, 3))))
+    grid = cuts.get_point_grid(coords, 0.0001)
+
+    mirror = cuts.find_mirror_points(grid, coords, np.arange(len(coords)), 0.0001)
+
+    dists = np.linalg.norm(coords[None] - (coords * (-1.0, 1.0, 1.0))[:, None], axis=2)
+    expected = np.where(dists.min(axis=1) <= 0.0001, dists.argmin(axis=1), -1)
+    np.testing.assert_array_equal(mirror, expected)
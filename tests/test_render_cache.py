@@ -0,0 +1,166 @@
+""" Tests of the widget render cache with stand-ins for gpu. Run with python -m pytest tests, Blender is not needed. """
+
+import gc
+import importlib.util
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+# The widgets package imports bpy, load the module on its own
+_spec = importlib.util.spec_from_file_location(
+    "bl_ui_render_cache", os.path.join(os.path.dirname(__file__), os.pardir, "bl_ui_widgets", "bl_ui_render_cache.py"))
+bl_ui_render_cache = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(bl_ui_render_cache)
+
+
+class FakeGpu:
+    """ Stand-in for the gpu module that counts the builtin shaders it creates. """
+
+    def __init__(self):
+        self.created = []
+        self.shader = types.SimpleNamespace(from_builtin=self.from_builtin)
+
+    def from_builtin(self, name):
+        self.created.append(name)
+        return ("shader", name, len(self.created))
+
+
+class FakeBatch:
+    def __init__(self, shader, type, content, indices=None):
+        self.shader = shader
+        self.type = type
+        self.content = content
+        self.indices = indices
+
+
+class Owner:
+    """ Batches are cached per owner, which must be weakly referenceable. """
+
+
+@pytest.fixture
+def gpu():
+    return FakeGpu()
+
+
+@pytest.fixture
+def cache(gpu):
+    return bl_ui_render_cache.BL_UI_Render_Cache(gpu_module=gpu, batch_func=FakeBatch)
+
+
+def test_shaders_are_shared(cache, gpu):
+    assert cache.shader('2D_UNIFORM_COLOR') is cache.shader('2D_UNIFORM_COLOR')
+    cache.shader('2D_FLAT_COLOR')
+
+    assert gpu.created == ['2D_UNIFORM_COLOR', '2D_FLAT_COLOR']
+
+
+def test_batches_are_reused_until_the_geometry_changes(cache):
+    owner = Owner()
+    content = {"pos": [(0, 0), (0, 10), (10, 10)]}
+
+    batch = cache.batch(owner, "panel", '2D_UNIFORM_COLOR', 'TRIS', content, indices=[(0, 1, 2)])
+    # Equal content built again, as update() does
+    same = cache.batch(owner, "panel", '2D_UNIFORM_COLOR', 'TRIS', {"pos": [(0, 0), (0, 10), (10, 10)]},
+                       indices=[(0, 1, 2)])
+    assert same is batch
+    assert cache.builds == 1
+
+    moved = cache.batch(owner, "panel", '2D_UNIFORM_COLOR', 'TRIS', {"pos": [(1, 0), (1, 10), (11, 10)]},
+                        indices=[(0, 1, 2)])
+    assert moved is not batch
+    assert moved.content == {"pos": [(1, 0), (1, 10), (11, 10)]}
+    assert cache.builds == 2
+
+    # Parts and owners are cached separately
+    cache.batch(owner, "outline", '2D_UNIFORM_COLOR', 'TRIS', content, indices=[(0, 1, 2)])
+    cache.batch(Owner(), "panel", '2D_UNIFORM_COLOR', 'TRIS', content, indices=[(0, 1, 2)])
+    assert cache.builds == 4
+
+
+def test_numpy_content_is_compared_by_value(cache):
+    owner = Owner()
+    pos = np.array([(0, 0), (0, 10), (10, 10)], dtype=np.float32)
+
+    batch = cache.batch(owner, "lines", '2D_UNIFORM_COLOR', 'LINES', {"pos": pos})
+    assert cache.batch(owner, "lines", '2D_UNIFORM_COLOR', 'LINES', {"pos": pos.copy()}) is batch
+
+    pos[0, 0] = 1
+    assert cache.batch(owner, "lines", '2D_UNIFORM_COLOR', 'LINES', {"pos": pos}) is not batch
+
+
+def test_batches_go_away_with_their_owner(cache):
+    owner = Owner()
+    cache.batch(owner, "panel", '2D_UNIFORM_COLOR', 'TRIS', {"pos": [(0, 0)]})
+    assert len(cache._batches) == 1
+
+    del owner
+    gc.collect()
+    assert len(cache._batches) == 0
+
+
+def test_discard(cache):
+    owner = Owner()
+    batch = cache.batch(owner, "panel", '2D_UNIFORM_COLOR', 'TRIS', {"pos": [(0, 0)]})
+    cache.discard(owner, "panel")
+
+    assert cache.batch(owner, "panel", '2D_UNIFORM_COLOR', 'TRIS', {"pos": [(0, 0)]}) is not batch
+
+
+def test_gpu_is_imported_on_first_use(monkeypatch):
+    gpu = FakeGpu()
+    gpu_extras = types.ModuleType("gpu_extras")
+    gpu_extras_batch = types.ModuleType("gpu_extras.batch")
+    gpu_extras_batch.batch_for_shader = FakeBatch
+    gpu_extras.batch = gpu_extras_batch
+
+    monkeypatch.setitem(sys.modules, "gpu", gpu)
+    monkeypatch.setitem(sys.modules, "gpu_extras", gpu_extras)
+    monkeypatch.setitem(sys.modules, "gpu_extras.batch", gpu_extras_batch)
+
+    cache = bl_ui_render_cache.BL_UI_Render_Cache()
+    batch = cache.batch(Owner(), "panel", '2D_FLAT_COLOR', 'TRIS', {"pos": [(0, 0)]})
+
+    assert isinstance(batch, FakeBatch)
+    assert batch.shader == ("shader", '2D_FLAT_COLOR', 1)
+
+
+def test_merge_rects():
+    red = (1.0, 0.0, 0.0, 1.0)
+    blue = (0.0, 0.0, 1.0, 0.5)
+    rects = [(bl_ui_render_cache.rect_vertices(0, 100, 10, 20), red),
+             (bl_ui_render_cache.rect_vertices(50, 100, 30, 40), blue)]
+
+    content, indices = bl_ui_render_cache.merge_rects(rects)
+
+    assert content["pos"] == list(rects[0][0]) + list(rects[1][0])
+    assert content["color"] == [red] * 4 + [blue] * 4
+    # Two triangles per rectangle, in order
+    assert indices == [(0, 1, 2), (0, 2, 3), (4, 5, 6), (4, 6, 7)]
+
+
+def test_merge_no_rects():
+    assert bl_ui_render_cache.merge_rects([]) == ({"pos": [], "color": []}, [])
+
+
+class Widget:
+    def __init__(self, name, rect=None):
+        self.name = name
+        self.merged = rect is not None
+        self.rect = rect
+
+    def panel_rect(self):
+        return bl_ui_render_cache.rect_vertices(*self.rect), (1.0, 1.0, 1.0, 1.0)
+
+
+def test_draw_runs_keep_the_widget_order():
+    widgets = [Widget("a", (0, 100, 10, 10)), Widget("b", (20, 100, 10, 10)), Widget("label"),
+               Widget("c", (0, 100, 10, 10)), Widget("overlaps c", (5, 95, 10, 10)), Widget("touches", (15, 100, 5, 5))]
+
+    runs = bl_ui_render_cache.get_draw_runs(widgets)
+
+    assert [[widget.name for widget in run_widgets] for run_widgets, _ in runs] == \
+        [["a", "b", "label"], ["c"], ["overlaps c", "touches"]]
+    assert [len(rects) for _, rects in runs] == [2, 1, 2]
@@ -8,6 +8,9 @@ import bgl
 from gpu_extras.batch import batch_for_shader
 
 from . bl_ui_widgets.bl_ui_widget import BL_UI_Widget
+from . bl_ui_widgets.bl_ui_render_cache import render_cache
+from . bl_ui_widgets.bl_ui_draw_op import draw_widgets, merge_panels
+from . bl_ui_widgets.bl_ui_text_metrics import text_metrics
 from . bl_ui_widgets.bl_ui_textbox import BL_UI_Textbox
 from . bl_ui_widgets.bl_ui_label import BL_UI_Label
 
@@ -32,8 +35,6 @@ class TextLabel(BL_UI_Label):
         self.x_screen = x
         self.y_screen = y
 
-        self.draw()
-
 class TextLabelProperty(TextLabel):
     def __init__(self, x, y, width, height, scale ,context, initial_val, set_text_func, use_ui_scale=False, hotkey_hint=None, show_hotkeys=False):
         super().__init__(x, y, width, height, scale, None, context, use_ui_scale)
@@ -50,8 +51,6 @@ class TextLabelProperty(TextLabel):
         self.x_screen = x
         self.y_screen = y
 
-        self.draw()
-
     def update_text(self, text):
         self.text = self._set_text_func(text)
         if self.hotkey_hint is not None and self.show_hotkeys:
@@ -73,6 +72,7 @@ class TextLayoutPanel(object):
             "Failed to register text object. Name Exists: {0} Object Exists: {1}".format(name_found, obj_found)
 
         self.text_objects[att_name] = obj
+        merge_panels((obj,))
 
     def check_if_registered(self, att_name, obj):
         name_found = False
@@ -94,8 +94,7 @@ class TextLayoutPanel(object):
             next_y += self.vertical_spacing + text_obj.height
 
     def draw(self):
-         for text_obj in self.text_objects.values():
-             text_obj.draw()
+        draw_widgets(self, list(self.text_objects.values()))
 
     def update_text(self,  obj, key, new_value):
         if key in self.text_objects:
@@ -131,7 +130,7 @@ class TextBox(BL_UI_Textbox):
     def update_label(self):
         y_screen_flip = self.get_area_height() - self.y_screen
 
-        size = blf.dimensions(0, self._label)
+        size = text_metrics.dimensions(0, self._label)
 
         self._label_width = size[0]*2.2 + 12
 
@@ -142,7 +141,7 @@ class TextBox(BL_UI_Textbox):
                     (self.x_screen + self.width + self._label_width, y_screen_flip - self.height),
                     (self.x_screen, y_screen_flip - self.height))
                     
-        self.batch_outline = batch_for_shader(self.shader, 'LINE_LOOP', {"pos" : vertices_outline})
+        self.batch_outline = render_cache.batch(self, "outline", '2D_UNIFORM_COLOR', 'LINE_LOOP', {"pos" : vertices_outline})
 
         indices = ((0, 1, 2), (2, 3, 1))
 
@@ -155,11 +154,12 @@ class TextBox(BL_UI_Textbox):
                     (lb_x, y_screen_flip - self.height),
                     (lb_x + self._label_width, y_screen_flip - self.height))
                     
-        self.batch_label_bg = batch_for_shader(self.shader, 'TRIS', {"pos" : vertices_label_bg}, indices=indices)
+        self.batch_label_bg = render_cache.batch(self, "label_bg", '2D_UNIFORM_COLOR', 'TRIS', {"pos" : vertices_label_bg}, indices=indices)
+        self.invalidate()
 
     def get_carret_pos_px(self):
-        size_all = blf.dimensions(0, self._text)
-        size_to_carret = blf.dimensions(0, self._text[:self._carret_pos])
+        size_all = text_metrics.dimensions(0, self._text)
+        size_to_carret = text_metrics.dimensions(0, self._text[:self._carret_pos])
         return self.x_screen + (self.width / 2.0) - (size_all[0] / 2.0) + size_to_carret[0] + 5
 
     def update_carret(self):
@@ -167,15 +167,16 @@ class TextBox(BL_UI_Textbox):
 
         x = self.get_carret_pos_px()
 
-        text_height = blf.dimensions(0, self._label)[0]
+        text_height = text_metrics.dimensions(0, self._label)[0]
         # bottom left, top left, top right, bottom right
         vertices = (
             (x, y_screen_flip - 6),
             (x, (y_screen_flip - self.height) + 6)
         )
 
-        self.batch_carret = batch_for_shader(
-            self.shader, 'LINES', {"pos": vertices})
+        self.batch_carret = render_cache.batch(
+            self, "carret", '2D_UNIFORM_COLOR', 'LINES', {"pos": vertices})
+        self.invalidate()
 
     def draw(self):
         BL_UI_Widget.draw(self)
@@ -200,7 +201,7 @@ class TextBox(BL_UI_Textbox):
 
             self.batch_label_bg.draw(self.shader)
 
-            size = blf.dimensions(0, self._label)
+            size = text_metrics.dimensions(0, self._label)
 
             textpos_y = area_height - self.y_screen - (self.height + size[1]) / 2.0
             blf.position(0, self.x_screen + self.width + (self._label_width / 2.0) - (size[0]  / 2.0), textpos_y + 1, 0)
@@ -261,6 +262,7 @@ class TextBox(BL_UI_Textbox):
         else:
             self._has_keyboard_focus = False
             self.batch_carret = None
+            self.invalidate()
 
         return False
 
@@ -270,6 +272,30 @@ class TextBox(BL_UI_Textbox):
     def mouse_up(self, x, y):
         pass
 
+def draw_polyline(points, color=(1.0, 1.0, 1.0, 1.0), closed=False):
+    """ Draw a line through region space points. """
+
+    shader = render_cache.shader('2D_UNIFORM_COLOR')
+    batch = batch_for_shader(shader, 'LINE_LOOP' if closed else 'LINE_STRIP', {"pos": points})
+
+    shader.bind()
+    shader.uniform_float("color", color)
+    batch.draw(shader)
+
+
+def draw_lines(points, color=(1.0, 1.0, 1.0, 1.0), width=1):
+    """ Draw separate lines between each pair of region space points. """
+
+    shader = render_cache.shader('2D_UNIFORM_COLOR')
+    batch = batch_for_shader(shader, 'LINES', {"pos": points})
+
+    bgl.glLineWidth(width)
+    shader.bind()
+    shader.uniform_float("color", color)
+    batch.draw(shader)
+    bgl.glLineWidth(1)
+
+
 def header(*args):
     '''Join arguments with ` | ` between each.'''
     return ' | '.join(args)
\ No newline at end of file
@@ -1,7 +1,9 @@
 import bpy
 import bmesh
+import numpy as np
 from bmesh.types import *
 from mathutils import Vector, Matrix
+from mathutils.geometry import intersect_point_line
 
 # Adapted from blender source code
 def bmesh_edge_ring_walker(edge: BMEdge):
@@ -45,13 +47,15 @@ def bmesh_edge_ring_walker(edge: BMEdge):
 
 def bmesh_face_loop_walker(face: BMFace):
     # Get the first loop
-    next_loop = face.loops[0]
+    first_loop = face.loops[0]
+    next_loop = first_loop
     test_condition = True
     while test_condition:
         yield next_loop
 
         next_loop = next_loop.link_loop_next
-        test_condition = next_loop.index != face.loops[0].index
+        # Compare the loops themselves. Loop indices are not kept up to date by every bmesh.
+        test_condition = next_loop != first_loop
 
 
 def bmesh_subdivide_edge(bm: BMesh, edge: BMEdge, n=1):
@@ -86,6 +90,18 @@ def scale_verts_along_edge(bm, verts, start, end, factor):
 
     bmesh_scale(bm, [factor, factor, factor], mat, verts)
 
+def get_nearest_edge(face: BMFace, co: Vector) -> BMEdge:
+    """ Find the edge of a face that is closest to a point. """
+
+    def dist_squared(edge):
+        vert_a, vert_b = edge.verts
+        _, perc = intersect_point_line(co, vert_a.co, vert_b.co)
+        closest = vert_a.co.lerp(vert_b.co, clamp(0.0, perc, 1.0))
+        return (closest - co).length_squared
+
+    return min(face.edges, key=dist_squared)
+
+
 def clamp(minvalue, value, maxvalue):
     return max(minvalue, min(value, maxvalue))
 
@@ -129,6 +145,433 @@ class Event(object):
         return callback
 
 
+def group_objects_by_mesh(objects):
+    """ Group mesh objects by their mesh datablock.
+
+        Linked duplicates share one mesh, so only the first user of each mesh needs to be processed.
+        The others see the result through the shared data.
+
+        Args:
+            objects: Iterable of objects. Non mesh objects are skipped.
+
+        Returns:
+            A dict mapping each unique mesh to the list of objects using it, in the order they were found.
+    """
+
+    users = {}
+    for obj in objects:
+        if obj.type == 'MESH':
+            users.setdefault(obj.data, []).append(obj)
+
+    return users
+
+
+def suspend_modifiers(depsgraph, objects, types=(), min_time=0.0):
+    """ Turn off the edit mode display of the heavy modifiers of the objects.
+
+        A modifier is heavy if its type is in types, or if its last evaluation took at least min_time seconds.
+
+        Args:
+            depsgraph: The evaluated depsgraph the evaluation times are read from.
+            objects: Iterable of objects.
+            types: Modifier types to suspend.
+            min_time: Evaluation time in seconds. 0 ignores the evaluation time.
+
+        Returns:
+            A list of (object, modifier name) pairs for restore_modifiers.
+    """
+
+    suspended = []
+    for obj in objects:
+        obj_eval = obj.evaluated_get(depsgraph) if min_time > 0.0 else None
+        for mod in obj.modifiers:
+            if not mod.show_in_editmode:
+                continue
+
+            heavy = mod.type in types
+            if not heavy and obj_eval is not None:
+                mod_eval = obj_eval.modifiers.get(mod.name)
+                heavy = mod_eval is not None and getattr(mod_eval, "execution_time", 0.0) >= min_time
+
+            if heavy:
+                mod.show_in_editmode = False
+                suspended.append((obj, mod.name))
+
+    return suspended
+
+
+def restore_modifiers(suspended):
+    """ Turn the edit mode display of the modifiers returned by suspend_modifiers back on. """
+
+    for obj, name in suspended:
+        mod = obj.modifiers.get(name)
+        if mod is not None:
+            mod.show_in_editmode = True
+
+
+def get_edge_coords(mesh: bpy.types.Mesh):
+    """ Coordinates of the two vertices of all the edges of a mesh as an (edges, 2, 3) numpy array. """
+
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    coords = coords.reshape(-1, 3)
+
+    edge_verts = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edge_verts)
+
+    return coords[edge_verts].reshape(-1, 2, 3)
+
+
+def get_bounds_corners(coords):
+    """ The 8 corners of the bounding box of (n, 3) coordinates, as an (8, 3) numpy array. """
+
+    if len(coords) == 0:
+        return np.zeros((8, 3), dtype=np.float32)
+
+    bounds = np.stack((coords.min(axis=0), coords.max(axis=0)))
+    return bounds[np.indices((2, 2, 2)).reshape(3, -1).T, np.arange(3)]
+
+
+def project_to_region(region, rv3d, matrix: Matrix, coords):
+    """ Project local coordinates to region space, like view3d_utils.location_3d_to_region_2d but in bulk.
+
+        Args:
+            region: The region to project to.
+            rv3d: The 3D view data of the region.
+            matrix: World matrix of the object the coordinates belong to.
+            coords: (n, 3) numpy array of coordinates.
+
+        Returns:
+            An (n, 2) array of region coordinates and an (n,) array with the depth of each coordinate.
+            Coordinates with a depth <= 0 are behind the view and their region coordinates are meaningless.
+    """
+
+    mat = np.array(rv3d.perspective_matrix @ matrix, dtype=np.float32)
+
+    clip = coords @ mat[:3, :3].T + mat[:3, 3]
+    w = coords @ mat[3, :3] + mat[3, 3]
+
+    safe_w = np.where(w > 0.0, w, 1.0)
+
+    ret = np.empty((len(coords), 2), dtype=np.float32)
+    ret[:, 0] = (1.0 + clip[:, 0] / safe_w) * (region.width / 2.0)
+    ret[:, 1] = (1.0 + clip[:, 1] / safe_w) * (region.height / 2.0)
+
+    return ret, w
+
+
+def points_in_box(points, corner_a, corner_b):
+    """ Mask of the (n, 2) points inside the rectangle spanned by two corners. """
+
+    box_min = np.minimum(corner_a, corner_b)
+    box_max = np.maximum(corner_a, corner_b)
+
+    return np.all((points >= box_min) & (points <= box_max), axis=1)
+
+
+def points_in_polygon(points, polygon):
+    """ Mask of the (n, 2) points inside a polygon, using the even-odd rule.
+
+        The points are tested together against one polygon edge at a time.
+    """
+
+    polygon = np.asarray(polygon, dtype=np.float32)
+    x = points[:, 0]
+    y = points[:, 1]
+
+    inside = np.zeros(len(points), dtype=bool)
+    for (x1, y1), (x2, y2) in zip(polygon, np.roll(polygon, -1, axis=0)):
+        if y1 == y2:
+            continue
+
+        crosses = (y1 > y) != (y2 > y)
+        x_cross = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (x < x_cross)
+
+    return inside
+
+
+class ScreenEdgeIndex(object):
+    """ Uniform grid over edges projected to region space, to find the edge under the mouse.
+
+        Every edge is sampled at least once per cell along its length and registered in the cells of its samples.
+        A query only looks at the 3x3 cells around the mouse, so it doesn't depend on the number of edges.
+        The grid has to be rebuilt when the view changes.
+    """
+
+    # Offset that keeps the cell coordinates positive when they are packed into one key
+    CELL_OFFSET = 1 << 20
+    # Cap on the samples of a single edge, for edges that get very long in front of the camera
+    MAX_SAMPLES = 256
+
+    def __init__(self, cell_size=20):
+        self.cell_size = cell_size
+
+        # Identifies the view the grid was built for
+        self.view_key = None
+
+        self.edges = None
+        self.coords = None
+        self.depths = None
+
+        # Sorted unique cell keys, the start of each cell in cell_edges and the edges of all cells
+        self.cell_keys = None
+        self.cell_starts = None
+        self.cell_edges = None
+
+    def cell_key(self, cells):
+        cells = np.clip(cells, 1 - self.CELL_OFFSET, self.CELL_OFFSET - 1) + self.CELL_OFFSET
+        return cells[..., 0] * (2 * self.CELL_OFFSET) + cells[..., 1]
+
+    def build(self, edges, coords, depths, view_key=None):
+        """ Fill the grid.
+
+            Args:
+                edges: (n,) array of edge indices.
+                coords: (n, 2, 2) array with the region coordinates of the two vertices of each edge.
+                depths: (n, 2) array with the depth of the two vertices of each edge. Edges behind the view are skipped.
+                view_key: Any value identifying the view, see is_valid.
+        """
+
+        in_front = np.all(depths > 0.0, axis=1)
+        self.edges = edges[in_front]
+        self.coords = coords[in_front]
+        self.depths = depths[in_front]
+        self.view_key = view_key
+
+        start = self.coords[:, 0]
+        vec = self.coords[:, 1] - start
+        length = np.sqrt(np.einsum('ij,ij->i', vec, vec))
+
+        # Sample each edge at least once per cell
+        counts = np.minimum(np.ceil(length / self.cell_size).astype(np.int64), self.MAX_SAMPLES) + 1
+        owners = np.repeat(np.arange(len(counts)), counts)
+        offsets = np.arange(len(owners)) - np.repeat(np.cumsum(counts) - counts, counts)
+        t = offsets / np.maximum(counts[owners] - 1, 1)
+
+        samples = start[owners] + vec[owners] * t[:, None]
+        keys = self.cell_key(np.floor(samples / self.cell_size).astype(np.int64))
+
+        # Sort by cell and drop the samples of an edge that fall in the same cell
+        order = np.lexsort((owners, keys))
+        keys = keys[order]
+        owners = owners[order]
+        unique = np.ones(len(keys), dtype=bool)
+        unique[1:] = (keys[1:] != keys[:-1]) | (owners[1:] != owners[:-1])
+        keys = keys[unique]
+
+        self.cell_edges = owners[unique]
+        self.cell_keys, self.cell_starts = np.unique(keys, return_index=True)
+
+    def is_valid(self, view_key):
+        return self.cell_keys is not None and self.view_key == view_key
+
+    def nearest(self, x, y, radius=10.0):
+        """ Find the edge closest to a region coordinate.
+
+            Of the edges closer than radius, which should not exceed half the cell size, the front-most one is returned.
+
+            Returns:
+                The depth and the index of the edge, or None.
+        """
+
+        if self.cell_keys is None or len(self.cell_keys) == 0:
+            return None
+
+        cell_x = int(np.floor(x / self.cell_size))
+        cell_y = int(np.floor(y / self.cell_size))
+        keys = self.cell_key(np.array([(cell_x + i, cell_y + j) for i in (-1, 0, 1) for j in (-1, 0, 1)]))
+
+        pos = np.searchsorted(self.cell_keys, keys)
+        found = pos < len(self.cell_keys)
+        found[found] = self.cell_keys[pos[found]] == keys[found]
+        pos = pos[found]
+        if len(pos) == 0:
+            return None
+
+        ends = np.append(self.cell_starts, len(self.cell_edges))
+        candidates = np.unique(np.concatenate([self.cell_edges[ends[p]:ends[p + 1]] for p in pos]))
+
+        start = self.coords[candidates, 0]
+        vec = self.coords[candidates, 1] - start
+        length_sq = np.maximum(np.einsum('ij,ij->i', vec, vec), 1e-12)
+        t = np.clip(((np.array((x, y)) - start) * vec).sum(axis=1) / length_sq, 0.0, 1.0)
+
+        closest = start + vec * t[:, None]
+        dist = np.hypot(closest[:, 0] - x, closest[:, 1] - y)
+
+        near = dist <= radius
+        if not near.any():
+            return None
+
+        depth = self.depths[candidates, 0] * (1.0 - t) + self.depths[candidates, 1] * t
+        depth = np.where(near, depth, np.inf)
+        best = int(np.argmin(depth))
+
+        return float(depth[best]), int(self.edges[candidates[best]])
+
+
+def get_edge_values(mesh: bpy.types.Mesh, attribute=None):
+    """ Read an edge attribute of a mesh in bulk.
+
+        Args:
+            mesh: The mesh to read from. Edit mode changes must be written to the mesh first.
+            attribute: Name of an edge domain attribute. The edge crease is read when None.
+
+        Returns:
+            A numpy array with one value per edge, or None if the attribute does not exist on the edge domain.
+    """
+
+    dtypes = {'BOOLEAN': bool, 'INT': np.int32, 'INT8': np.int8, 'FLOAT': np.float32}
+
+    if attribute is None:
+        # The crease is a generic attribute since Blender 4.0
+        attr = mesh.attributes.get("crease_edge")
+        if attr is None:
+            values = np.zeros(len(mesh.edges), dtype=np.float32)
+            # Before 4.0 the crease is an edge property. Since then, a mesh without the attribute has no crease.
+            if "crease" in bpy.types.MeshEdge.bl_rna.properties:
+                mesh.edges.foreach_get("crease", values)
+            return values
+    else:
+        attr = mesh.attributes.get(attribute)
+
+    if attr is None or attr.domain != 'EDGE' or attr.data_type not in dtypes:
+        return None
+
+    values = np.zeros(len(mesh.edges), dtype=dtypes[attr.data_type])
+    attr.data.foreach_get("value", values)
+    return values
+
+
+# Number of segments a crease of 1 stands for in get_edge_segments
+CREASE_SEGMENTS = 10
+
+
+def get_edge_segments(mesh: bpy.types.Mesh, attribute=None):
+    """ Number of segments of each edge of a mesh, read in bulk from an edge attribute or the crease.
+
+        Args:
+            mesh: The mesh to read from. Edit mode changes must be written to the mesh first.
+            attribute: Name of an edge domain attribute holding the number of segments. Floats are rounded.
+            The crease is read when None, a crease of 1 being CREASE_SEGMENTS segments.
+
+        Returns:
+            An int numpy array with one value per edge, below 1 for no count, or None if the attribute does not exist.
+    """
+
+    values = get_edge_values(mesh, attribute)
+    if values is None:
+        return None
+
+    if attribute is None:
+        values = values * CREASE_SEGMENTS
+
+    return np.rint(values).astype(np.int64)
+
+
+# Interpolated attribute data types, with the property holding the value and its number of components
+ATTRIBUTE_FIELDS = {
+    'FLOAT': ("value", 1),
+    'FLOAT2': ("vector", 2),
+    'FLOAT_VECTOR': ("vector", 3),
+    'FLOAT_COLOR': ("color", 4),
+    'BYTE_COLOR': ("color", 4),
+}
+
+
+def get_attribute_layers(mesh: bpy.types.Mesh, domain):
+    """ The attributes of a domain that can be interpolated.
+
+        UV maps of versions that don't store them as attributes are included for the 'CORNER' domain.
+
+        Returns:
+            A list of (name, field, width) tuples for get_layer_values and set_layer_values.
+            The field is "uv" for such UV maps.
+    """
+
+    layers = []
+    for attr in mesh.attributes:
+        # Skip internal attributes and the positions
+        if attr.domain != domain or attr.name.startswith(".") or attr.name == "position":
+            continue
+
+        field = ATTRIBUTE_FIELDS.get(attr.data_type)
+        if field is not None:
+            layers.append((attr.name, *field))
+
+    if domain == 'CORNER':
+        names = {name for name, _, _ in layers}
+        for uv_layer in mesh.uv_layers:
+            if uv_layer.name not in names:
+                layers.append((uv_layer.name, "uv", 2))
+
+    return layers
+
+
+def get_layer_data(mesh: bpy.types.Mesh, name, field):
+    if field == "uv":
+        return mesh.uv_layers[name].data
+
+    return mesh.attributes[name].data
+
+
+def get_layer_values(mesh: bpy.types.Mesh, name, field, width):
+    """ Values of an attribute from get_attribute_layers as an (elements, width) numpy array. """
+
+    data = get_layer_data(mesh, name, field)
+    values = np.empty(len(data) * width, dtype=np.float32)
+    data.foreach_get(field, values)
+    return values.reshape(-1, width)
+
+
+def set_layer_values(mesh: bpy.types.Mesh, name, field, values):
+    get_layer_data(mesh, name, field).foreach_set(field, np.ascontiguousarray(values, dtype=np.float32).ravel())
+
+
+def get_shape_key_coords(mesh: bpy.types.Mesh):
+    """ Coordinates of all the shape keys of a mesh as a (keys, vertices, 3) numpy array. """
+
+    key_blocks = mesh.shape_keys.key_blocks if mesh.shape_keys is not None else ()
+    coords = np.empty((len(key_blocks), len(mesh.vertices) * 3), dtype=np.float32)
+    for key_block, key_coords in zip(key_blocks, coords):
+        key_block.data.foreach_get("co", key_coords)
+
+    return coords.reshape(len(key_blocks), -1, 3)
+
+
+def set_shape_key_coords(mesh: bpy.types.Mesh, coords):
+    for key_block, key_coords in zip(mesh.shape_keys.key_blocks, coords):
+        key_block.data.foreach_set("co", np.ascontiguousarray(key_coords, dtype=np.float32).ravel())
+
+
+def get_corner_normals(mesh: bpy.types.Mesh):
+    """ Normal of each corner of a mesh, custom normals included, as an (corners, 3) numpy array. """
+
+    normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+    if hasattr(mesh, "corner_normals"):
+        # Blender 4.1+
+        mesh.corner_normals.foreach_get("vector", normals)
+    else:
+        mesh.calc_normals_split()
+        mesh.loops.foreach_get("normal", normals)
+
+    return normals.reshape(-1, 3)
+
+
+def get_corner_topology(mesh: bpy.types.Mesh):
+    """ Face and vertex of each corner of a mesh as two numpy arrays. """
+
+    corner_verts = np.empty(len(mesh.loops), dtype=np.int64)
+    mesh.loops.foreach_get("vertex_index", corner_verts)
+
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int64)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    corner_faces = np.repeat(np.arange(len(mesh.polygons)), loop_totals)
+
+    return corner_faces, corner_verts
+
+
 def get_addon_prefs(context):
     preferences = context.preferences
     return preferences.addons[__package__].preferences
\ No newline at end of file